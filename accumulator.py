@@ -0,0 +1,85 @@
+import math
+
+import numpy as np
+
+import anova
+
+
+class VariantStats:
+    """Mergeable per-variant count, mean and centred sum of squares.
+
+    Single observations are added and removed with Welford's update, partial
+    accumulators are combined with Chan's parallel formula. Producing the
+    ANOVA table costs O(variants) regardless of how many values were seen.
+    """
+
+    def __init__(self, l: int):
+        self.count: np.ndarray = np.zeros(l, dtype=np.int64)
+        self.mean: np.ndarray = np.zeros(l)
+        self.M2: np.ndarray = np.zeros(l)  # Сума квадратів відхилень від середнього
+
+    @classmethod
+    def fromMatrix(cls, X):
+        # NaN - пропущені клітинки, вони не враховуються
+        X = np.asarray(X, dtype=float)
+        mask = ~np.isnan(X)
+        stats = cls(np.shape(X)[0])
+        stats.count[:] = np.sum(mask, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats.mean[:] = np.where(stats.count > 0, np.sum(np.where(mask, X, 0), axis=1) / stats.count, 0)
+        stats.M2[:] = np.sum(np.where(mask, np.square(X - stats.mean[:, None]), 0), axis=1)
+        return stats
+
+    def __len__(self):
+        return len(self.count)
+
+    def add(self, variant: int, x: float):
+        n = self.count[variant] + 1
+        delta = x - self.mean[variant]
+        self.mean[variant] += delta / n
+        self.M2[variant] += delta * (x - self.mean[variant])
+        self.count[variant] = n
+
+    def remove(self, variant: int, x: float):
+        n = self.count[variant] - 1
+        if n < 0:
+            raise ValueError(f'Variant {variant} has no observations to remove')
+        if n == 0:
+            self.mean[variant] = 0.0
+            self.M2[variant] = 0.0
+        else:
+            delta = x - self.mean[variant]
+            self.mean[variant] -= delta / n
+            self.M2[variant] = max(self.M2[variant] - delta * (x - self.mean[variant]), 0.0)
+        self.count[variant] = n
+
+    def replace(self, variant: int, old: float, new: float):
+        # Редагування однієї клітинки: O(1) замість повного перерахунку; NaN - порожня клітинка
+        if not math.isnan(old):
+            self.remove(variant, old)
+        if not math.isnan(new):
+            self.add(variant, new)
+
+    def merge(self, other: 'VariantStats') -> 'VariantStats':
+        if len(other) != len(self):
+            raise ValueError(f'Cannot merge {len(other)} variants into {len(self)}')
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(n > 0, other.count / n, 0.0)
+        self.M2 += other.M2 + np.square(delta) * self.count * weight
+        self.mean += delta * weight
+        self.count = n
+        return self
+
+    def copy(self) -> 'VariantStats':
+        stats = VariantStats(len(self))
+        stats.count[:] = self.count
+        stats.mean[:] = self.mean
+        stats.M2[:] = self.M2
+        return stats
+
+    def toOutput(self) -> anova.BatchOutput:
+        if np.all(self.count == self.count[0]):
+            return anova.BatchOutput.fromMoments(self.mean[None], self.M2[None], self.count[:1])
+        return anova.BatchOutput.fromMoments(self.mean[None], self.M2[None], self.count[None])
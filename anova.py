@@ -0,0 +1,208 @@
+import math
+
+import numpy as np
+
+import fisher_tables as ft
+import profiling
+
+
+def jsonSafe(value):
+    """Replace NaN and infinities (also inside dicts and lists) with None, so JSON gets null."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: jsonSafe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonSafe(item) for item in value]
+    return value
+
+
+class BatchOutput:
+    """Columnar one-way ANOVA results for a batch of trials.
+
+    Every attribute mirrors the same-named attribute of ``DispOutput`` but
+    holds an array with one entry per trial (``V``, ``means`` and ``counts``
+    hold one row per trial). With unequal replicate counts ``n`` is their
+    harmonic mean, used for the errors of means and differences.
+    """
+
+    fields = ('l', 'n', 'N', 'avg', 'C', 'CY', 'CV', 'CZ', 's2v', 's2', 'v',
+              'sx', 'sd', 'sd_percent', 'Ff', 'F05', 't05', 'HCP05', 'HCP05_percent')
+    rounded = ('avg', 'CY', 'CV', 'CZ', 's2', 's2v', 'sx', 'sd', 'sd_percent',
+               'Ff', 'F05', 'v', 'HCP05', 'HCP05_percent')
+
+    def __init__(self, total, sumsq, V, n):
+        """``n`` is the replicate count per trial, or per trial and variant (trials x variants)."""
+        total = np.asarray(total, dtype=float)
+        sumsq = np.asarray(sumsq, dtype=float)
+        self.V: np.ndarray = np.asarray(V, dtype=float)  # Суми по варіантах
+
+        if np.ndim(n) == 2:
+            balanced = self._counts(n)
+            S = np.sum(np.square(self.V) / np.where(self.counts > 0, self.counts, 1), axis=1)
+            # Для збалансованих дослідів - та сама формула, що й нижче, щоб результати збігались до біта
+            S = np.where(balanced, np.sum(np.square(self.V), axis=1) / self.n, S)
+        else:
+            self.l: np.ndarray = np.full(len(total), np.shape(self.V)[1])  # Число варіантів
+            self.n: np.ndarray = np.broadcast_to(np.asarray(n), np.shape(total)).copy()  # Число спостережень
+            self.N: np.ndarray = self.l * self.n  # Загальна кількість спостережень
+            self.counts: np.ndarray = np.broadcast_to(self.n[:, None], np.shape(self.V)).copy()
+            S = np.sum(np.square(self.V), axis=1) / self.n
+        self.avg: np.ndarray = total / self.N
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.means: np.ndarray = self.V / self.counts  # Середні по варіантах (NaN для порожніх)
+
+        self.C: np.ndarray = np.square(total) / self.N
+        self.CY: np.ndarray = sumsq - self.C
+        self.CV: np.ndarray = S - self.C
+        self.CZ: np.ndarray = self.CY - self.CV
+        self._derive()
+
+    def _counts(self, counts):
+        # Нерівна кількість повторень: варіанти без жодного спостереження не враховуються
+        self.counts = np.asarray(counts).astype(np.int64)
+        present = self.counts > 0
+        self.l = np.count_nonzero(present, axis=1)
+        self.N = np.sum(self.counts, axis=1)
+        balanced = np.all(self.counts == self.counts[:, :1], axis=1)
+        if balanced.all():
+            self.n = self.counts[:, 0].copy()
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                harmonic = self.l / np.sum(np.where(present, 1 / np.where(present, self.counts, 1), 0), axis=1)
+            self.n = np.where(balanced, self.counts[:, 0], harmonic)  # Середнє гармонічне кількостей
+        return balanced
+
+    @classmethod
+    def fromMoments(cls, means, M2, n):
+        """Build the results from per-variant means and centred sums of squares.
+
+        This is the numerically stable path used by ``accumulator.VariantStats``:
+        ``CV`` and ``CZ`` are taken from deviations instead of the difference of
+        two large raw sums.
+        """
+        out = cls.__new__(cls)
+        out.means = np.asarray(means, dtype=float)
+        if np.ndim(n) == 2:
+            out._counts(n)
+            out.V = out.means * out.counts
+            out.avg = np.sum(out.V, axis=1) / out.N
+            out.CV = np.sum(out.counts * np.square(out.means - out.avg[:, None]), axis=1)
+        else:
+            out.l = np.full(len(out.means), np.shape(out.means)[1])
+            out.n = np.broadcast_to(np.asarray(n), np.shape(out.l)).copy()
+            out.N = out.l * out.n
+            out.counts = np.broadcast_to(out.n[:, None], np.shape(out.means)).copy()
+            out.V = out.means * out.n[:, None]
+            out.avg = np.mean(out.means, axis=1)
+            out.CV = out.n * np.sum(np.square(out.means - out.avg[:, None]), axis=1)
+
+        out.C = np.square(np.sum(out.V, axis=1)) / out.N
+        out.CZ = np.sum(M2, axis=1)
+        out.CY = out.CV + out.CZ
+        out._derive()
+        return out
+
+    def _derive(self):
+        self.s2v: np.ndarray = self.CV / (self.l - 1)  # Середній квадрат варіантів
+        self.s2: np.ndarray = self.CZ / (self.N - self.l)  # Середній квадрат помилки
+        self.v: np.ndarray = 100 * np.sqrt(self.s2) / self.avg  # Коефіцієнт варіації, %
+
+        self.sx: np.ndarray = np.sqrt(self.s2 / self.n)  # Помилка досліду
+        self.sd: np.ndarray = np.sqrt(2 * self.s2 / self.n)  # Помилка різниці середніх
+        self.sd_percent: np.ndarray = 100 * self.sd / self.avg  # Відносна помилка різниці середніх
+
+        self.Ff: np.ndarray = self.s2v / self.s2
+        self.F05: np.ndarray = ft.f_crit_array(0.05, self.l - 1, self.N - self.l)
+        self.t05: np.ndarray = ft.t_crit_array(0.95, self.N - self.l)
+
+        self.HCP05: np.ndarray = self.t05 * self.sd
+        self.HCP05_percent: np.ndarray = (self.HCP05 * 100) / self.avg
+
+    def __len__(self):
+        return len(self.avg)
+
+    def __getitem__(self, i) -> dict:
+        row = {name: getattr(self, name)[i].item() for name in self.fields}
+        row['V'] = self.V[i].tolist()
+        row['means'] = self.means[i].tolist()
+        row['counts'] = self.counts[i].tolist()
+        return row
+
+    def roundVals(self, n):
+        for name in self.rounded:
+            setattr(self, name, np.round(getattr(self, name), n))
+
+    def toColumns(self) -> dict:
+        columns = {name: getattr(self, name) for name in self.fields}
+        columns['V'] = self.V
+        columns['means'] = self.means
+        columns['counts'] = self.counts
+        return columns
+
+
+@profiling.timed('batchAnova')
+def batchAnova(X) -> BatchOutput:
+    """One-way ANOVA for many trials at once.
+
+    ``X`` is either a 3-D array (trials x variants x replicates) or an
+    iterable of 2-D matrices of possibly different shapes. Ragged input is
+    grouped by shape, every group is computed in one pass and the results
+    come back in the original order. NaN cells are missing plots: each trial
+    gets its own per-variant counts from the mask.
+    """
+    if isinstance(X, np.ndarray) and X.ndim == 3:
+        X = np.ascontiguousarray(X, dtype=float)
+        mask = ~np.isnan(X)
+        if not mask.all():
+            X = np.where(mask, X, 0.0)
+            return BatchOutput(np.sum(X, axis=(1, 2)),
+                               np.sum(np.square(X), axis=(1, 2)),
+                               np.sum(X, axis=2),
+                               np.sum(mask, axis=2))
+        return BatchOutput(np.sum(X, axis=(1, 2)),
+                           np.sum(np.square(X), axis=(1, 2)),
+                           np.sum(X, axis=2),
+                           np.shape(X)[2])
+
+    stacks, order = groupByShape(X)
+    if len(stacks) == 1:
+        return batchAnova(stacks[0])
+    return concatOutputs([batchAnova(stack) for stack in stacks], order)
+
+
+def groupByShape(X):
+    """Stack an iterable of arrays into one stacked array per distinct shape.
+
+    Returns ``(stacks, order)``: concatenating per-stack results and indexing
+    with ``order`` restores the original order of ``X``.
+    """
+    arrays = [np.asarray(x, dtype=float) for x in X]
+    groups = {}
+    for i, x in enumerate(arrays):
+        groups.setdefault(np.shape(x), []).append(i)
+    stacks = [np.stack([arrays[i] for i in idx]) for idx in groups.values()]
+    order = np.argsort(np.concatenate(list(groups.values())), kind='stable')
+    return stacks, order
+
+
+def concatOutputs(parts: list, order=None) -> BatchOutput:
+    """Join several ``BatchOutput`` objects into one, optionally reordering trials.
+
+    Trials with different numbers of variants cannot share the ``V`` and
+    ``means`` columns, so those are kept as object arrays of rows.
+    """
+    out = BatchOutput.__new__(BatchOutput)
+    if order is None:
+        order = np.arange(sum(len(p) for p in parts))
+    for name in BatchOutput.fields:
+        setattr(out, name, np.concatenate([getattr(p, name) for p in parts])[order])
+    for name in ('V', 'means', 'counts'):
+        rows = [row for p in parts for row in getattr(p, name)]
+        if len({len(row) for row in rows}) == 1:
+            setattr(out, name, np.stack(rows)[order])
+        else:
+            column = np.empty(len(rows), dtype=object)
+            column[:] = rows
+            setattr(out, name, column[order])
+    return out
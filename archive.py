@@ -0,0 +1,226 @@
+import os
+import json
+import math
+import struct
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Формат файлу архіву:
+#   MAGIC | блоки float64 (вирівняні по 8 байт) | JSON-індекс | зміщення індексу, довжина індексу | MAGIC
+# Індекс зберігає для кожного досліду id, форму, зміщення даних і метадані, тож будь-який
+# дослід відкривається як вікно в np.memmap без читання інших.
+# Нові дані й новий індекс дописуються після старого трейлера, тож до запису нового трейлера
+# попередній індекс лишається цілим; якщо процес упав посеред дописування, readIndex знаходить
+# останній повний трейлер, а недописаний хвіст ігнорується.
+# Старі індекси після цього - мертве місце; коли його більше, ніж живих даних (і не менше
+# COMPACT_MIN), flush переписує архів начисто (compact), тож розмір файлу лишається лінійним.
+
+MAGIC = b'VATRIAL1'
+TRAILER = struct.Struct('<QQ8s')
+SUFFIX = '.vatrial'
+SCAN_BLOCK = 1 << 20  # Крок пошуку останнього цілого трейлера з кінця файлу
+COMPACT_MIN = 1 << 20  # Мертве місце, з якого flush стискає архів, байт
+
+
+def _aligned(size: int) -> int:
+    return -(-size // 8) * 8
+
+
+class TrialArchive:
+    """Binary store of many trial matrices with a small JSON index.
+
+    ``mode='r'`` opens an existing archive read-only; ``mode='a'`` creates it
+    if needed and allows ``add``. The index is written by ``flush``/``close``
+    (also on leaving a ``with`` block); trials added since the last flush are
+    lost on a crash, the ones indexed before stay readable.
+    """
+
+    def __init__(self, path, mode='r'):
+        if mode not in ('r', 'a'):
+            raise ValueError(f'Unknown mode: {mode}')
+        self.path = Path(path)
+        self.mode = mode
+        self.index = {}
+        self.dirty = False
+        self._map = None
+        if self.path.exists() and self.path.stat().st_size > 0:
+            self.readIndex()
+            # Дописування йде в кінець файлу, за чинним трейлером
+            self.data_end = _aligned(self.path.stat().st_size)
+        elif mode == 'a':
+            with open(self.path, 'wb') as f:
+                f.write(MAGIC)
+            self.data_end = len(MAGIC)
+            self.dirty = True
+        else:
+            raise FileNotFoundError(self.path)
+
+    def readIndex(self):
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{self.path} is not a trial archive')
+            end = f.seek(0, os.SEEK_END)
+            entries = self._indexAt(f, end)
+            while entries is None:
+                # Хвіст недописаний: шукаємо попередній повний трейлер
+                end = self._previousTrailer(f, end - 1)
+                if end is None:
+                    raise ValueError(f'{self.path} has no index (was it closed properly?)')
+                entries = self._indexAt(f, end)
+        self.index = {entry['id']: entry for entry in entries}
+
+    @staticmethod
+    def _indexAt(f, end):
+        # Індекс, трейлер якого закінчується на позиції end, або None
+        if end < len(MAGIC) + TRAILER.size:
+            return None
+        f.seek(end - TRAILER.size)
+        offset, length, magic = TRAILER.unpack(f.read(TRAILER.size))
+        if magic != MAGIC or offset + length != end - TRAILER.size:
+            return None
+        f.seek(offset)
+        try:
+            return json.loads(f.read(length).decode('utf-8'))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _previousTrailer(f, end):
+        # Кінець останнього входження MAGIC, що закінчується не пізніше end
+        while end > len(MAGIC):
+            start = max(0, end - SCAN_BLOCK)
+            f.seek(start)
+            found = f.read(end - start).rfind(MAGIC)
+            if found > 0 or (found == 0 and start > 0):
+                return start + found + len(MAGIC)
+            end = start + len(MAGIC) - 1  # Перекриття, щоб не пропустити MAGIC на межі блоків
+            if start == 0:
+                return None
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, trial_id):
+        return str(trial_id) in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def ids(self) -> list:
+        return list(self.index)
+
+    def info(self, trial_id) -> dict:
+        return self.index[str(trial_id)]
+
+    def memmap(self) -> np.ndarray:
+        # Увесь файл як float64; зміщення даних кратні 8 байтам
+        if self._map is None:
+            self._map = np.memmap(self.path, dtype=np.float64, mode='r',
+                                  shape=(self.path.stat().st_size // 8,))
+        return self._map
+
+    def __getitem__(self, trial_id) -> np.ndarray:
+        entry = self.index[str(trial_id)]
+        start = entry['offset'] // 8
+        size = int(np.prod(entry['shape']))
+        return self.memmap()[start:start + size].reshape(entry['shape'])
+
+    def stack(self, ids=None) -> np.ndarray:
+        """Return the given (default: all) same-shape trials as one 3-D array."""
+        return np.stack([self[trial_id] for trial_id in (self.ids() if ids is None else ids)])
+
+    def add(self, trial_id, X, meta=None):
+        if self.mode != 'a':
+            raise ValueError('Archive is opened read-only')
+        trial_id = str(trial_id)
+        if trial_id in self.index:
+            raise KeyError(f'Trial {trial_id!r} already exists')
+        X = np.ascontiguousarray(X, dtype='<f8')
+        self._map = None
+        with open(self.path, 'r+b') as f:
+            f.seek(self.data_end)
+            f.write(X.tobytes())
+        self.index[trial_id] = {'id': trial_id, 'shape': list(X.shape), 'offset': self.data_end, 'meta': meta or {}}
+        self.data_end += X.nbytes
+        self.dirty = True
+
+    def flush(self):
+        if not self.dirty:
+            return
+        payload = json.dumps(list(self.index.values()), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        with open(self.path, 'r+b') as f:
+            f.seek(self.data_end)
+            f.write(payload)
+            f.write(TRAILER.pack(self.data_end, len(payload), MAGIC))
+            f.flush()
+            os.fsync(f.fileno())
+            # Наступні дані - вже після цього трейлера
+            self.data_end = _aligned(f.tell())
+        self.dirty = False
+        data = sum(8 * math.prod(entry['shape']) for entry in self.index.values())
+        live = len(MAGIC) + data + len(payload) + TRAILER.size
+        if self.data_end - live > max(live, COMPACT_MIN):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the archive with only its trials and one index, dropping old indexes.
+
+        The new file is written next to the archive and swapped in with
+        ``os.replace``, so a crash leaves the old archive intact.
+        """
+        if self.mode != 'a':
+            raise ValueError('Archive is opened read-only')
+        index, offset = {}, len(MAGIC)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f'.{self.path.name}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(MAGIC)
+                for trial_id in self.index:
+                    data = np.ascontiguousarray(self[trial_id], dtype='<f8').tobytes()
+                    f.write(data)
+                    index[trial_id] = {**self.index[trial_id], 'offset': offset}
+                    offset += len(data)
+                payload = json.dumps(list(index.values()), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                f.write(payload)
+                f.write(TRAILER.pack(offset, len(payload), MAGIC))
+                f.flush()
+                os.fsync(f.fileno())
+                data_end = _aligned(f.tell())
+            self._map = None
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.index, self.data_end = index, data_end
+        self.dirty = False
+
+    def close(self):
+        if self.mode == 'a':
+            self.flush()
+        self._map = None
+
+    def importConfig(self, cfg_path, trial_id=None, meta=None):
+        # Імпорт з формату .variance-analysis-cfg (JSON)
+        cfg_path = Path(cfg_path)
+        with open(cfg_path) as f:
+            cfg = json.load(f)
+        X = np.asarray(cfg['cells'], dtype=float)[:cfg.get('rows'), :cfg.get('cols')]
+        self.add(trial_id or cfg_path.stem or cfg_path.name, X, meta)
+
+    def exportConfig(self, trial_id, cfg_path):
+        X = self[trial_id]
+        cells = X.round(2).astype(object)
+        cells[np.isnan(X)] = None  # Пропущені клітинки - null, як у графічному інтерфейсі
+        cfg = {'rows': X.shape[0], 'cols': X.shape[1], 'cells': cells.tolist()}
+        with open(cfg_path, 'w') as f:
+            f.write(json.dumps(cfg, sort_keys=True, indent=2))
@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+import profiling
+
+# Фонове збереження стану сесії. Знімки, що надходять частіше за DELAY, зливаються в один запис,
+# файл пишеться в тимчасовий поруч і атомарно підміняється (os.replace), тож обрив запису не
+# псує конфігурацію; попередні версії лишаються як <path>.1 ... <path>.N.
+
+DELAY = 0.5  # Скільки чекати тиші після останньої зміни, с
+MAX_DELAY = 5.0  # Найдовше відкладання при безперервних змінах, с
+BACKUPS = 3
+
+
+def backupPath(path, i: int) -> Path:
+    path = Path(path)
+    return path.with_name(f'{path.name}.{i}')
+
+
+def loadSnapshot(path, backups=BACKUPS):
+    """Return ``(state, source)`` for the newest snapshot that parses, or ``(None, None)``."""
+    for candidate in [Path(path)] + [backupPath(path, i) for i in range(1, backups + 1)]:
+        try:
+            with open(candidate, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(state, dict):
+            return state, candidate
+    return None, None
+
+
+def writeSnapshot(path, data: bytes, backups=BACKUPS):
+    """Atomically replace ``path`` with ``data``, shifting the previous versions into backups."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if backups and path.exists():
+            for i in range(backups - 1, 0, -1):
+                if backupPath(path, i).exists():
+                    os.replace(backupPath(path, i), backupPath(path, i + 1))
+            os.replace(path, backupPath(path, 1))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class AutoSaver:
+    """Write-behind saver: ``submit`` only stores the latest state, a daemon thread writes it.
+
+    ``default`` converts values ``json`` cannot (e.g. the matrix, passed as an
+    array copy so serialisation happens off the UI thread). ``close`` writes
+    whatever is still pending.
+    """
+
+    def __init__(self, path, backups=BACKUPS, delay=DELAY, max_delay=MAX_DELAY, default=None):
+        self.path = Path(path)
+        self.backups = backups
+        self.delay = delay
+        self.max_delay = max_delay
+        self.default = default
+        self.saves = 0
+        self.coalesced = 0
+        self.error = None
+        self._pending = None
+        self._first = self._due = 0.0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self._thread.start()
+
+    def submit(self, state: dict):
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('AutoSaver is closed')
+            if self._pending is None:
+                self._first = now
+            else:
+                self.coalesced += 1
+                profiling.count('autosave.coalesced')
+            self._pending = state
+            self._due = min(now + self.delay, self._first + self.max_delay)
+            self._cond.notify()
+
+    def flush(self):
+        """Write the pending state now, in the calling thread."""
+        with self._cond:
+            state, self._pending = self._pending, None
+        if state is not None:
+            self._write(state)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                # Чекаємо, поки зміни стихнуть; кожен submit відсуває строк
+                while not self._closed and (remaining := self._due - time.monotonic()) > 0:
+                    self._cond.wait(remaining)
+                state, self._pending = self._pending, None
+                if state is None:
+                    return  # Закрито, нічого не лишилось
+            self._write(state)
+
+    def _write(self, state):
+        with self._write_lock, profiling.span('autosave.write'):
+            try:
+                data = json.dumps(state, default=self.default, separators=(',', ':')).encode('utf-8')
+                writeSnapshot(self.path, data, self.backups)
+            except (OSError, TypeError, ValueError) as e:
+                self.error = e
+                print(f'Autosave to {self.path} failed: {e}', file=sys.stderr)
+            else:
+                self.saves += 1
+                self.error = None
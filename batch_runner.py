@@ -0,0 +1,238 @@
+import os
+import sys
+import json
+import uuid
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+import anova
+from matrix_io import readMatrix, CFG_NAME
+from result_cache import ResultCache, matrixKey
+
+PATTERNS = ('*.csv', '*.txt', '*.xlsx', '*.json', '*.cfg', CFG_NAME)
+CHUNK_SIZE = 64
+
+
+def findFiles(root) -> list:
+    root = Path(root)
+    files = {path for pattern in PATTERNS for path in root.rglob(pattern) if path.is_file()}
+    return sorted(str(path) for path in files)
+
+
+def analyzeChunk(paths: list, digits=None, cache_dir=None):
+    """Worker: read a chunk of files and compute them in one vectorized batch.
+
+    Returns ``(records, failures)``; a file that cannot be read or computed
+    becomes a failure instead of failing the whole chunk. With ``cache_dir``
+    records of matrices analysed before (by content, not by file name) are
+    taken from the shared on-disk cache and only the rest is computed.
+    """
+    cache = ResultCache(max_items=0, directory=cache_dir) if cache_dir else None
+    records = {}
+    matrices, names, keys, failures = [], [], [], []
+    for path in paths:
+        try:
+            X = readMatrix(path)
+            if X.ndim != 2 or min(X.shape) < 2:
+                raise ValueError(f'expected at least 2 variants x 2 replicates, got shape {X.shape}')
+        except Exception as e:
+            failures.append({'file': path, 'error': f'{type(e).__name__}: {e}'})
+            continue
+        key = matrixKey(X, 'record', digits=digits) if cache else None
+        record = cache.get(key) if cache else None
+        if record is not None:
+            records[path] = record
+        else:
+            matrices.append(X)
+            names.append(path)
+            keys.append(key)
+    if matrices:
+        out = anova.batchAnova(matrices)
+        if digits is not None:
+            out.roundVals(digits)
+        for i, path in enumerate(names):
+            records[path] = out[i]
+            if cache:
+                cache.put(keys[i], records[path])
+    return [{'file': path, **records[path]} for path in paths if path in records], failures
+
+
+class Manifest:
+    """Append-only list of files already processed, used to resume an interrupted run.
+
+    Every entry also records where the results output ended after that
+    chunk (``end`` - JSONL offset, ``part`` - Parquet part), and each run
+    starts with a ``start`` entry, so results written after the last entry
+    (a crash between the two writes) can be dropped on resume.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.done = set()
+        self.tracked = False  # Чи є в маніфесті позиції виводу (старі маніфести їх не мають)
+        self.position = 0
+        self.parts = set()
+        if self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if 'start' in entry:
+                        self.tracked = True
+                        if isinstance(entry['start'], list):
+                            self.parts.update(entry['start'])
+                        else:
+                            self.position = entry['start']
+                    if 'file' in entry:
+                        self.done.add(entry['file'])
+                    self.position = entry.get('end', self.position)
+                    if entry.get('part'):
+                        self.parts.add(entry['part'])
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def begin(self, position):
+        self.file.write(json.dumps({'start': position}, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def add(self, paths, failed, marker):
+        for path in paths:
+            self.file.write(json.dumps({'file': path, 'ok': path not in failed, **marker}, ensure_ascii=False) + '\n')
+        self.file.flush()
+        self.done.update(paths)
+
+    def close(self):
+        self.file.close()
+
+
+class ResultWriter:
+    """JSONL file appended per chunk, or a Parquet dataset directory with one part per chunk.
+
+    With ``append=False`` output of a previous run (JSONL, errors file and
+    Parquet parts) is discarded first.
+    """
+
+    def __init__(self, path, append=True):
+        self.path = Path(path)
+        self.parquet = self.path.suffix.lower() == '.parquet'
+        mode = 'a' if append else 'w'
+        if self.parquet:
+            self.path.mkdir(parents=True, exist_ok=True)
+            if not append:
+                for part in self.path.glob('part-*.parquet'):
+                    part.unlink()
+        else:
+            self.file = open(self.path, mode, encoding='utf-8')
+        self.errors = open(self.path.with_name(self.path.name + '.errors.jsonl'), mode, encoding='utf-8')
+
+    def position(self):
+        if self.parquet:
+            return sorted(part.name for part in self.path.glob('part-*.parquet'))
+        return self.file.tell()
+
+    def rollback(self, manifest: Manifest):
+        # Результати, записані після останнього запису маніфесту, належать файлам, які буде
+        # перераховано, тож відкидаються, щоб не дублювати рядки
+        if not manifest.tracked:
+            return
+        if self.parquet:
+            for part in self.path.glob('part-*.parquet'):
+                if part.name not in manifest.parts:
+                    part.unlink()
+        elif self.file.tell() > manifest.position:
+            self.file.truncate(manifest.position)
+
+    def write(self, records, failures) -> dict:
+        """Write one chunk; returns its position marker for the manifest."""
+        marker = {}
+        if records and self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            marker['part'] = f'part-{uuid.uuid4().hex}.parquet'
+            pq.write_table(pa.Table.from_pylist(records), self.path / marker['part'])
+        elif records:
+            self.file.writelines(json.dumps(anova.jsonSafe(record), ensure_ascii=False, allow_nan=False) + '\n'
+                                 for record in records)
+            self.file.flush()
+        if not self.parquet:
+            marker['end'] = self.file.tell()
+        if failures:
+            self.errors.writelines(json.dumps(failure, ensure_ascii=False) + '\n' for failure in failures)
+            self.errors.flush()
+        return marker
+
+    def close(self):
+        if not self.parquet:
+            self.file.close()
+        self.errors.close()
+
+
+def run(root, output, workers=None, chunk_size=CHUNK_SIZE, digits=None, resume=True, cache_dir=None) -> dict:
+    """Analyse every trial file under ``root`` on a process pool.
+
+    Results are written as soon as each chunk completes; the manifest next to
+    ``output`` is updated only after its results are flushed, so a crashed run
+    restarted with ``resume=True`` skips exactly the finished files and drops
+    results of unfinished ones; ``resume=False`` (or a missing manifest) starts
+    over and replaces earlier output. A chunk whose worker failed as a whole (e.g.
+    killed, ``BrokenProcessPool``) is logged to the errors file but not marked
+    done, so the next run retries it; ``retry`` in the summary counts those
+    files. ``cache_dir`` keeps results between runs (see ``analyzeChunk``).
+    """
+    output = Path(output)
+    manifest_path = output.with_name(output.name + '.manifest.jsonl')
+    # Без маніфесту наявний вивід не можна зіставити з файлами, тож він теж починається заново
+    fresh = not resume or not manifest_path.exists()
+    if fresh and manifest_path.exists():
+        manifest_path.unlink()
+    manifest = Manifest(manifest_path)
+    writer = ResultWriter(output, append=not fresh)
+    writer.rollback(manifest)
+    manifest.begin(writer.position())
+    todo = [path for path in findFiles(root) if path not in manifest.done]
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    summary = {'files': len(todo), 'skipped': len(manifest.done), 'ok': 0, 'failed': 0, 'retry': 0}
+
+    workers = workers or os.cpu_count() or 1
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            queue = iter(chunks)
+            while True:
+                # Не більше двох чанків на процес у черзі, щоб не тримати всі результати в пам'яті
+                while len(pending) < 2 * workers:
+                    chunk = next(queue, None)
+                    if chunk is None:
+                        break
+                    try:
+                        pending[pool.submit(analyzeChunk, chunk, digits, cache_dir)] = chunk
+                    except BrokenProcessPool:
+                        queue = iter(())  # Пул зламано: решта файлів лишається на повторний запуск
+                        break
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    chunk = pending.pop(future)
+                    try:
+                        records, failures = future.result()
+                    except Exception as e:
+                        # Збій усього чанка, а не окремих файлів: у маніфест не записується
+                        writer.write([], [{'file': path, 'error': f'{type(e).__name__}: {e}', 'retry': True}
+                                          for path in chunk])
+                        continue
+                    marker = writer.write(records, failures)
+                    manifest.add(chunk, {failure['file'] for failure in failures}, marker)
+                    summary['ok'] += len(records)
+                    summary['failed'] += len(failures)
+    finally:
+        writer.close()
+        manifest.close()
+    summary['retry'] = summary['files'] - summary['ok'] - summary['failed']
+    return summary
+
+
+def main(args):
+    summary = run(args.root, args.output, args.workers, args.chunk_size, args.round, not args.restart, args.cache)
+    print(json.dumps(summary), file=sys.stderr)
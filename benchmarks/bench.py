@@ -0,0 +1,175 @@
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+from pathlib import Path
+from statistics import median
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import anova  # noqa: E402
+import fisher_tables as ft  # noqa: E402
+from disp_output import DispOutput  # noqa: E402
+from excel_export import ExcelExporter  # noqa: E402
+
+SHAPES = [(3, 4), (10, 6), (50, 6), (200, 10), (1000, 50)]
+BATCHES = [(100, 10, 4), (10_000, 10, 4), (10_000, 50, 6)]
+
+
+def makeTrial(rng, l, n) -> np.ndarray:
+    # Урожайність: ефект варіанту + шум повторень, без від'ємних значень
+    effects = rng.normal(0, 3, size=(l, 1))
+    return np.abs(rng.normal(40, 4, size=(l, n)) + effects).round(2)
+
+
+def makeBatch(rng, t, l, n) -> np.ndarray:
+    effects = rng.normal(0, 3, size=(t, l, 1))
+    return np.abs(rng.normal(40, 4, size=(t, l, n)) + effects).round(2)
+
+
+def measure(fn, items=1, repeat=5, min_time=0.2) -> dict:
+    """Time ``fn`` and record its peak traced allocation.
+
+    Each repeat runs ``fn`` enough times to take at least ``min_time``
+    seconds; throughput is ``items`` per second of the median repeat.
+    """
+    fn()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+    times = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        times.append((time.perf_counter() - start) / loops)
+    return {'seconds': median(times), 'min_seconds': min(times), 'loops': loops,
+            'throughput': items / median(times), 'peak_bytes': peak}
+
+
+def benchCompute(rng, shapes, batches):
+    for l, n in shapes:
+        X = makeTrial(rng, l, n)
+        yield f'compute/disp_output/{l}x{n}', measure(lambda: DispOutput(X), 1)
+    for t, l, n in batches:
+        X = makeBatch(rng, t, l, n)
+        yield f'compute/batch/{t}x{l}x{n}', measure(lambda: anova.batchAnova(X), t, repeat=3)
+
+
+def benchCritical(rng):
+    df = rng.integers(2, 500, size=(10_000, 2))
+    yield 'critical/f05_cached', measure(lambda: ft.f05_distr(5, 24), 1)
+
+    def cold():
+        ft._f_crit.cache_clear()
+        ft.f05_distr(5, 24)
+    yield 'critical/f05_uncached', measure(cold, 1)
+    yield 'critical/f_crit_array/10000', measure(lambda: ft.f_crit_array(0.05, df[:, 0], df[:, 1]), len(df))
+    yield 'critical/t_crit_array/10000', measure(lambda: ft.t_crit_array(0.95, df[:, 1]), len(df))
+
+
+def benchMarkdown(rng, shapes):
+    for l, n in shapes:
+        disp = DispOutput(makeTrial(rng, l, n))
+        disp.roundVals(2)
+        yield f'markdown/{l}x{n}', measure(disp.toMarkdown, 1, repeat=3)
+
+
+def benchExcel(rng, shapes, trials):
+    with tempfile.TemporaryDirectory() as tmp:
+        for l, n in shapes:
+            disp = DispOutput(makeTrial(rng, l, n))
+            disp.roundVals(2)
+            path = Path(tmp) / 'single.xlsx'
+            yield f'excel/single/{l}x{n}', measure(lambda: disp.toExcel(path), 1, repeat=3)
+
+        analyses = [DispOutput(X) for X in makeBatch(rng, trials, 10, 4)]
+
+        def many():
+            with ExcelExporter(Path(tmp) / 'many.xlsx') as exporter:
+                for disp in analyses:
+                    exporter.add(disp)
+        yield f'excel/workbook/{trials}x10x4', measure(many, trials, repeat=1, min_time=0)
+
+
+def gitCommit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(args):
+    rng = np.random.default_rng(args.seed)
+    shapes = SHAPES[:3] if args.quick else SHAPES
+    batches = BATCHES[:1] if args.quick else BATCHES
+    groups = {'compute': lambda: benchCompute(rng, shapes, batches),
+              'critical': lambda: benchCritical(rng),
+              'markdown': lambda: benchMarkdown(rng, shapes),
+              'excel': lambda: benchExcel(rng, shapes[:3], 50 if args.quick else 500)}
+    results = {}
+    for group in args.only or groups:
+        for name, result in groups[group]():
+            results[name] = result
+            print(f'{name:40s} {result["seconds"] * 1e3:12.4f} ms {result["throughput"]:14.1f}/s '
+                  f'{result["peak_bytes"] / 1024:10.1f} KiB', flush=True)
+
+    report = {'commit': gitCommit(), 'python': platform.python_version(), 'numpy': np.__version__,
+              'machine': platform.machine(), 'seed': args.seed, 'results': results}
+    output = Path(args.output or f'bench-{report["commit"]}.json')
+    output.write_text(json.dumps(report, indent=2))
+    print(f'saved {output}')
+
+
+def compare(args):
+    # Відношення часу нового запуску до базового: >1 - повільніше
+    base = json.loads(Path(args.base).read_text())['results']
+    new = json.loads(Path(args.new).read_text())['results']
+    for name in sorted(base.keys() & new.keys()):
+        ratio = new[name]['seconds'] / base[name]['seconds']
+        mem = new[name]['peak_bytes'] / max(base[name]['peak_bytes'], 1)
+        flag = '  REGRESSION' if ratio > 1 + args.threshold else ''
+        print(f'{name:40s} time x{ratio:6.2f}  memory x{mem:6.2f}{flag}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks for the ANOVA core, critical values and reports')
+    commands = parser.add_subparsers(dest='command')
+    p = commands.add_parser('run')
+    p.add_argument('--quick', action='store_true', help='smaller shapes and batches')
+    p.add_argument('--only', nargs='+', choices=('compute', 'critical', 'markdown', 'excel'))
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('-o', '--output', help='JSON file (default bench-<commit>.json)')
+    p.set_defaults(func=run)
+    p = commands.add_parser('compare')
+    p.add_argument('base')
+    p.add_argument('new')
+    p.add_argument('--threshold', type=float, default=0.1, help='relative slowdown reported as a regression')
+    p.set_defaults(func=compare)
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(['run', *(argv or sys.argv[1:])])
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
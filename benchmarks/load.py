@@ -0,0 +1,73 @@
+import sys
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from statistics import median
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench import makeTrial  # noqa: E402
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(body)}\r\n\r\n'.encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode().partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return status, await reader.readexactly(int(headers['content-length']))
+
+
+async def client(host, port, matrices, latencies):
+    # Одне keep-alive з'єднання, запити послідовно
+    reader, writer = await asyncio.open_connection(host, port)
+    for X in matrices:
+        start = time.perf_counter()
+        status, _ = await request(reader, writer, 'POST', '/analyze', {'matrix': X, 'round': 2})
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            raise RuntimeError(f'/analyze returned {status}')
+    writer.close()
+
+
+async def run(args):
+    rng = np.random.default_rng(args.seed)
+    matrices = [makeTrial(rng, args.variants, args.replicates).tolist() for _ in range(args.requests)]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(args.host, args.port, matrices[i::args.concurrency], latencies)
+                           for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    _, body = await request(reader, writer, 'GET', '/metrics')
+    writer.close()
+    latencies = sorted(latencies)
+    print(f'{args.requests} requests, {args.concurrency} connections: {args.requests / elapsed:.0f} req/s, '
+          f'p50 {median(latencies) * 1e3:.2f} ms, p99 {latencies[int(0.99 * (len(latencies) - 1))] * 1e3:.2f} ms')
+    print(json.dumps(json.loads(body), indent=2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test for the local analysis server (cli.py serve)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--variants', type=int, default=10)
+    parser.add_argument('--replicates', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == '__main__':
+    main()
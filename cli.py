@@ -0,0 +1,275 @@
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+import anova
+import profiling
+from matrix_io import readMatrix
+
+
+def readInputs(paths):
+    """Return ``(names, matrices)``; a trial archive contributes every trial it holds."""
+    names, matrices = [], []
+    for path in paths:
+        if Path(path).suffix == '.vatrial':
+            from archive import TrialArchive
+            store = TrialArchive(path)
+            for trial_id in store:
+                names.append(f'{path}:{trial_id}')
+                matrices.append(store[trial_id])
+        else:
+            names.append(path)
+            matrices.append(readMatrix(path))
+    return names, matrices
+
+
+def writeRecords(records, output):
+    lines = (json.dumps(anova.jsonSafe(record), ensure_ascii=False, allow_nan=False) + '\n' for record in records)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+    else:
+        sys.stdout.writelines(lines)
+
+
+def analyze(args):
+    if args.long:
+        import ingest
+        records = []
+        for path in args.inputs:
+            trial_ids, out = ingest.analyzeFile(path)
+            if args.round is not None:
+                out.roundVals(args.round)
+            records += [{'file': path, 'trial': trial_id, **out[i]} for i, trial_id in enumerate(trial_ids)]
+        writeRecords(records, args.output)
+        return
+
+    names, matrices = readInputs(args.inputs)
+    if args.design == 'block':
+        if args.format != 'json':
+            raise ValueError('--design block supports only --format json')
+        import designs
+        out = designs.blockAnova(matrices)
+        if args.round is not None:
+            out.roundVals(args.round)
+        writeRecords(({'file': path, **out[i]} for i, path in enumerate(names)), args.output)
+        return
+    if args.format == 'json':
+        out = anova.batchAnova(matrices)
+        letters = [None] * len(out)
+        if args.posthoc:
+            from posthoc import pairwise
+            letters = [pairwise(out.means[i], out.s2[i], out.n[i], out.N[i] - out.l[i], args.posthoc).letters
+                       for i in range(len(out))]
+        extra = [{'letters': letter} if args.posthoc else {} for letter in letters]
+        if args.permutations or args.bootstrap:
+            import resampling
+            for i, X in enumerate(matrices):
+                if args.permutations:
+                    test = resampling.permutationTest(X, args.permutations, args.seed, args.workers)
+                    extra[i]['p_permutation'] = test['p_value']
+                if args.bootstrap:
+                    ci = resampling.bootstrap(X, args.bootstrap, seed=args.seed, workers=args.workers)
+                    extra[i].update(eta2=ci['eta2'], means_ci=ci['means_ci'], diffs_ci=ci['diffs_ci'])
+        if args.round is not None:
+            out.roundVals(args.round)
+        writeRecords(({'file': path, **out[i], **extra[i]} for i, path in enumerate(names)), args.output)
+        return
+
+    from disp_output import DispOutput
+
+    def analyses():
+        for X in matrices:
+            disp = DispOutput(X)
+            disp.roundVals(2 if args.round is None else args.round)
+            yield disp
+
+    if args.format == 'excel':
+        from excel_export import exportMany
+        exportMany(args.output or 'result.xlsx', analyses(), [Path(name).stem for name in names], args.layout)
+        return
+    import report
+    fmt = 'text' if args.format == 'markdown' else args.format
+    stems = [Path(name).stem for name in names]
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            report.writeReports(f, analyses(), fmt, stems)
+    else:
+        report.writeReports(sys.stdout, analyses(), fmt, stems)
+
+
+def plan(args):
+    from planner import PowerGrid, parseRange
+    options = dict(alphas=parseRange(args.alpha), effects=parseRange(args.effect), relative=args.relative,
+                   design=args.design, target=args.target)
+    variants, replicates = parseRange(args.variants, int), parseRange(args.replicates, int)
+    if args.source:
+        from disp_output import DispOutput
+        grid = PowerGrid.fromOutput(DispOutput(readMatrix(args.source)), variants, replicates, **options)
+    elif args.cv is not None:
+        if args.mean is None:
+            raise ValueError('--cv needs --mean')
+        grid = PowerGrid.fromCV(args.cv, args.mean, variants, replicates, **options)
+    elif args.s2 is not None:
+        grid = PowerGrid(args.s2, variants, replicates, mean=args.mean, **options)
+    else:
+        raise ValueError('one of --s2, --cv or --from is required')
+
+    if args.minimal:
+        table = grid.minimalReplicates()
+        alphas, effects = options['alphas'], options['effects']
+        columns = {'l': np.repeat(variants, len(alphas) * len(effects)),
+                   'alpha': np.tile(np.repeat(alphas, len(effects)), len(variants)),
+                   'effect': np.tile(effects, len(variants) * len(alphas)),
+                   'r': table.ravel()}
+    else:
+        columns = {name: getattr(grid, name) for name in PowerGrid.fields}
+    if args.round is not None:
+        columns = {name: np.round(values, args.round) if values.dtype.kind == 'f' else values
+                   for name, values in columns.items()}
+    rows = zip(*(values.tolist() for values in columns.values()))
+    f = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        if args.format == 'csv':
+            import csv
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(rows)
+        else:
+            f.writelines(json.dumps(anova.jsonSafe(dict(zip(columns, row))), allow_nan=False) + '\n' for row in rows)
+    finally:
+        if args.output:
+            f.close()
+
+
+def batch(args):
+    import batch_runner
+    batch_runner.main(args)
+
+
+def serve(args):
+    import server
+    server.main(args)
+
+
+def archive(args):
+    from archive import TrialArchive
+    if args.action == 'list':
+        with TrialArchive(args.archive) as store:
+            writeRecords(({'id': trial_id, 'shape': store.info(trial_id)['shape'], 'meta': store.info(trial_id)['meta']}
+                          for trial_id in store), args.output)
+    elif args.action == 'add':
+        with TrialArchive(args.archive, 'a') as store:
+            for path in args.files:
+                store.add(Path(path).stem or Path(path).name, readMatrix(path), {'source': str(path)})
+    elif args.action == 'compact':
+        with TrialArchive(args.archive, 'a') as store:
+            store.compact()
+    else:
+        with TrialArchive(args.archive) as store:
+            for trial_id in args.files:
+                store.exportConfig(trial_id, args.output or f'{trial_id}.variance-analysis-cfg')
+
+
+def buildParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='dispersion', description='Дисперсійний аналіз без графічного інтерфейсу')
+    parser.add_argument('--profile', action='store_true', help='виміряти час етапів, зведення в stderr')
+    parser.add_argument('--profile-output', metavar='FILE',
+                        help='записати виміри (вмикає --profile): .json - Chrome trace, інакше JSON Lines')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('analyze', help='розрахувати дисперсійний аналіз для файлів')
+    p.add_argument('inputs', nargs='+', help='матриці (.csv/.txt/.xlsx, .variance-analysis-cfg або архів .vatrial)')
+    p.add_argument('--format', choices=('json', 'markdown', 'html', 'csv', 'excel'), default='json',
+                   help='json - показники по дослідах; markdown, html, csv - повні звіти; excel - книга')
+    p.add_argument('--design', choices=('oneway', 'block'), default='oneway',
+                   help='block: стовпці матриці - повторення-блоки (рендомізовані блоки)')
+    p.add_argument('--posthoc', choices=('lsd', 'tukey', 'duncan'),
+                   help='json: буквені групи середніх за множинним порівнянням')
+    p.add_argument('--permutations', type=int, metavar='B',
+                   help='json: p-значення перестановочного тесту F з B перестановок')
+    p.add_argument('--bootstrap', type=int, metavar='B',
+                   help='json: бутстреп-інтервали (95%%) для середніх і їх різниць з першим варіантом з B вибірок')
+    p.add_argument('--seed', type=int, default=None, help='зерно генератора для відтворюваних перестановок')
+    p.add_argument('--workers', type=int, default=None, help='процеси для перестановок і бутстрепу')
+    p.add_argument('--long', action='store_true',
+                   help='довгий формат: стовпці trial, variant, replicate, value (лише json)')
+    p.add_argument('--round', type=int, default=None, help='кількість знаків після коми')
+    p.add_argument('--layout', choices=('sheets', 'stacked'), default='sheets',
+                   help='excel: кожен дослід на окремому аркуші або всі на одному')
+    p.add_argument('-o', '--output', help='файл результату (за замовчуванням stdout, для excel - result.xlsx)')
+    p.set_defaults(func=analyze)
+
+    p = commands.add_parser('batch', help='обробити всі файли дослідів у каталозі на кількох процесах')
+    p.add_argument('root', help='каталог із файлами дослідів')
+    p.add_argument('-o', '--output', required=True, help='результат: .jsonl або каталог .parquet')
+    p.add_argument('--workers', type=int, default=None, help='кількість процесів (за замовчуванням усі ядра)')
+    p.add_argument('--chunk-size', type=int, default=64, help='файлів на одне завдання')
+    p.add_argument('--round', type=int, default=None, help='кількість знаків після коми')
+    p.add_argument('--restart', action='store_true', help='ігнорувати маніфест і почати заново')
+    p.add_argument('--cache', metavar='DIR', help='каталог кешу результатів: незмінені досліди не перераховуються')
+    p.set_defaults(func=batch)
+
+    p = commands.add_parser('plan', help='потужність F-критерію і НІР для планування досліду')
+    source = p.add_mutually_exclusive_group()
+    source.add_argument('--s2', type=float, help='дисперсія помилки з попередніх дослідів')
+    source.add_argument('--cv', type=float, help='коефіцієнт варіації, %% (потрібне --mean)')
+    source.add_argument('--from', dest='source', metavar='FILE', help='взяти s2 і середнє з матриці досліду')
+    p.add_argument('--mean', type=float, help='середнє досліду (для --cv, --relative і НІР у %%)')
+    p.add_argument('--variants', default='2:20', help='кількість варіантів: a:b[:крок] або список (2:20)')
+    p.add_argument('--replicates', default='2:10', help='кількість повторень (2:10)')
+    p.add_argument('--alpha', default='0.05', help='рівні значущості (0.05)')
+    p.add_argument('--effect', default='1', help='найменша різниця між варіантами, яку треба виявити')
+    p.add_argument('--relative', action='store_true', help='--effect у %% від середнього')
+    p.add_argument('--design', choices=('crd', 'block'), default='crd',
+                   help='crd - повна рендомізація, block - повторення-блоки')
+    p.add_argument('--target', type=float, default=0.8, help='бажана потужність (0.8)')
+    p.add_argument('--minimal', action='store_true',
+                   help='лише найменша кількість повторень з потужністю --target (0 - не досягнуто)')
+    p.add_argument('--format', choices=('json', 'csv'), default='json')
+    p.add_argument('--round', type=int, default=None, help='кількість знаків після коми')
+    p.add_argument('-o', '--output', help='файл результату (за замовчуванням stdout)')
+    p.set_defaults(func=plan)
+
+    p = commands.add_parser('serve', help='локальний HTTP/JSON-сервіс (мікропакети запитів)')
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=8765)
+    p.add_argument('--excel-workers', type=int, default=1, help='процеси для експорту в Excel')
+    p.set_defaults(func=serve)
+
+    p = commands.add_parser('archive', help='бінарний архів дослідів (.vatrial)')
+    p.add_argument('action', choices=('add', 'list', 'export', 'compact'))
+    p.add_argument('archive', help='файл архіву .vatrial')
+    p.add_argument('files', nargs='*', help='add: файли матриць; export: id дослідів')
+    p.add_argument('-o', '--output', help='list: файл JSONL; export: шлях .variance-analysis-cfg')
+    p.set_defaults(func=archive)
+    return parser
+
+
+def main(argv=None):
+    parser = buildParser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'long', False) and args.format != 'json':
+        parser.error('--long supports only --format json')
+    if args.profile or args.profile_output:
+        profiling.enable(args.profile_output)
+    try:
+        with profiling.span(args.command):
+            args.func(args)
+    except BrokenPipeError:
+        return 0
+    except (OSError, ValueError, KeyError) as e:
+        print(f'dispersion: {e}', file=sys.stderr)
+        return 1
+    finally:
+        if profiling.enabled:
+            profiling.save()
+            print(profiling.summaryText(), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
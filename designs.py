@@ -0,0 +1,158 @@
+import numpy as np
+
+import anova
+import fisher_tables as ft
+
+LABELS = {'total': 'Загальна',
+          'blocks': 'Повторень',
+          'variants': 'Варіантів',
+          'A': 'Фактора A',
+          'B': 'Фактора B',
+          'AB': 'Взаємодії AB',
+          'error': 'Залишок (помилки)'}
+
+
+class DesignOutput:
+    """Columnar ANOVA table for a multi-source design, one entry per trial.
+
+    ``SS``, ``df``, ``MS`` are keyed by source (see ``LABELS``); ``F``,
+    ``F05``, ``HCP05`` and ``means`` exist for the tested effects only.
+    Sums of squares arrive precomputed from cell and marginal sums.
+    """
+
+    def __init__(self, SS: dict, df: dict, obs: dict, means: dict, total, N):
+        t = len(total)
+        self.sources = list(SS)
+        self.effects = [s for s in self.sources if s in obs]
+        self.N: np.ndarray = np.full(t, N)
+        self.avg: np.ndarray = total / N
+        self.SS = SS
+        self.df = {s: np.full(t, value) for s, value in df.items()}
+        self.MS = {s: SS[s] / df[s] for s in self.sources if s != 'total'}
+        self.means = means
+
+        self.s2: np.ndarray = self.MS['error']  # Середній квадрат помилки
+        self.v: np.ndarray = 100 * np.sqrt(self.s2) / self.avg  # Коефіцієнт варіації, %
+        self.t05: np.ndarray = ft.t_crit_array(0.95, self.df['error'])
+        self.F = {s: self.MS[s] / self.s2 for s in self.sources if s not in ('total', 'error')}
+        self.F05 = {s: ft.f_crit_array(0.05, self.df[s], self.df['error']) for s in self.F}
+        # НІР для середніх ефекту: obs - кількість спостережень у кожному середньому
+        self.HCP05 = {s: self.t05 * np.sqrt(2 * self.s2 / obs[s]) for s in self.effects}
+
+    def __len__(self):
+        return len(self.avg)
+
+    def __getitem__(self, i) -> dict:
+        return {'N': self.N[i].item(),
+                'avg': self.avg[i].item(),
+                's2': self.s2[i].item(),
+                'v': self.v[i].item(),
+                't05': self.t05[i].item(),
+                'table': [{'source': s,
+                           'SS': self.SS[s][i].item(),
+                           'df': self.df[s][i].item(),
+                           'MS': self.MS[s][i].item() if s in self.MS else None,
+                           'F': self.F[s][i].item() if s in self.F else None,
+                           'F05': self.F05[s][i].item() if s in self.F05 else None} for s in self.sources],
+                'HCP05': {s: self.HCP05[s][i].item() for s in self.effects},
+                'means': {s: self.means[s][i].tolist() for s in self.effects}}
+
+    def roundVals(self, n):
+        self.avg = np.round(self.avg, n)
+        self.s2 = np.round(self.s2, n)
+        self.v = np.round(self.v, n)
+        for table in (self.SS, self.MS, self.F, self.F05, self.HCP05):
+            for s in table:
+                table[s] = np.round(table[s], n)
+
+
+def concatDesigns(parts: list, order) -> DesignOutput:
+    """Join outputs of the same design computed for groups of differently shaped trials."""
+    out = DesignOutput.__new__(DesignOutput)
+    out.sources = parts[0].sources
+    out.effects = parts[0].effects
+    for name in ('N', 'avg', 's2', 'v', 't05'):
+        setattr(out, name, np.concatenate([getattr(p, name) for p in parts])[order])
+    for name in ('SS', 'df', 'MS', 'F', 'F05', 'HCP05'):
+        setattr(out, name, {s: np.concatenate([getattr(p, name)[s] for p in parts])[order]
+                            for s in getattr(parts[0], name)})
+    out.means = {}
+    for s in out.effects:
+        rows = [row for p in parts for row in p.means[s]]
+        column = np.empty(len(rows), dtype=object)
+        column[:] = rows
+        out.means[s] = column[order]
+    return out
+
+
+def _batched(X, ndim: int, compute):
+    # Один дослід, стек дослідів або різнорідний список (групується за формою)
+    if any(np.isnan(x).any() for x in (X if isinstance(X, list) else [X])):
+        raise ValueError('Missing cells are supported only by the one-way analysis (batchAnova)')
+    if isinstance(X, np.ndarray) and X.ndim == ndim - 1:
+        return compute(np.ascontiguousarray(X, dtype=float)[None])
+    if isinstance(X, np.ndarray) and X.ndim == ndim:
+        return compute(np.ascontiguousarray(X, dtype=float))
+    stacks, order = anova.groupByShape(X)
+    if len(stacks) == 1:
+        return compute(stacks[0])
+    return concatDesigns([compute(stack) for stack in stacks], order)
+
+
+def blockAnova(X) -> DesignOutput:
+    """Randomized complete block design: trials x variants x blocks.
+
+    The replicate columns of the usual matrix are treated as blocks, so their
+    variation is removed from the error term.
+    """
+    def compute(X):
+        _, l, r = X.shape
+        N = l * r
+        V = np.sum(X, axis=2)  # Суми по варіантах
+        P = np.sum(X, axis=1)  # Суми по повтореннях (блоках)
+        total = np.sum(V, axis=1)
+        C = np.square(total) / N
+        CY = np.sum(np.square(X), axis=(1, 2)) - C
+        CV = np.sum(np.square(V), axis=1) / r - C
+        CP = np.sum(np.square(P), axis=1) / l - C
+        SS = {'total': CY, 'blocks': CP, 'variants': CV, 'error': CY - CV - CP}
+        df = {'total': N - 1, 'blocks': r - 1, 'variants': l - 1, 'error': (l - 1) * (r - 1)}
+        return DesignOutput(SS, df, {'variants': r}, {'variants': V / r}, total, N)
+
+    return _batched(X, 3, compute)
+
+
+def twoFactorAnova(X, blocks=True) -> DesignOutput:
+    """Two-factor A x B design with interaction: trials x A levels x B levels x replicates.
+
+    With ``blocks=True`` the replicates are complete blocks (randomized block
+    layout) and get their own line in the table; otherwise they are plain
+    replicates of a completely randomized design.
+    """
+    def compute(X):
+        _, a, b, r = X.shape
+        N = a * b * r
+        S = np.sum(X, axis=3)  # Суми по клітинках A x B
+        A = np.sum(S, axis=2)
+        B = np.sum(S, axis=1)
+        total = np.sum(A, axis=1)
+        C = np.square(total) / N
+        CY = np.sum(np.square(X), axis=(1, 2, 3)) - C
+        C_cells = np.sum(np.square(S), axis=(1, 2)) / r - C
+        CA = np.sum(np.square(A), axis=1) / (b * r) - C
+        CB = np.sum(np.square(B), axis=1) / (a * r) - C
+        SS = {'total': CY}
+        df = {'total': N - 1}
+        error, error_df = CY - C_cells, a * b * (r - 1)
+        if blocks:
+            P = np.sum(X, axis=(1, 2))
+            SS['blocks'] = np.sum(np.square(P), axis=1) / (a * b) - C
+            df['blocks'] = r - 1
+            error, error_df = error - SS['blocks'], error_df - (r - 1)
+        SS.update({'A': CA, 'B': CB, 'AB': C_cells - CA - CB, 'error': error})
+        df.update({'A': a - 1, 'B': b - 1, 'AB': (a - 1) * (b - 1), 'error': error_df})
+        obs = {'A': b * r, 'B': a * r, 'AB': r}
+        means = {'A': A / (b * r), 'B': B / (a * r), 'AB': S / r}
+        return DesignOutput(SS, df, obs, means, total, N)
+
+    return _batched(X, 4, compute)
@@ -0,0 +1,111 @@
+import math
+
+import numpy as np
+
+import fisher_tables as ft
+import profiling
+
+
+class DispOutput:
+    @profiling.timed('DispOutput.__init__')
+    def __init__(self, X):
+        self.X: np.ndarray = X
+
+        mask = ~np.isnan(X)
+        if mask.all():
+            self.l: int = np.shape(X)[0]  # Число варіантів
+            self.n: int = np.shape(X)[1]  # Число спостережень
+            self.N: int = np.size(X)  # Загальна кількість спостережень
+            self.counts: np.ndarray = np.full(self.l, self.n)  # Спостережень у кожному варіанті
+            self.V: np.ndarray = np.sum(X, axis=1)  # Суми
+            self.means: np.ndarray = np.average(X, axis=1)  # Середні по варіантах
+            self.avg: float = np.average(X)
+
+            self.C: float = pow(np.sum(X), 2) / self.N
+            self.CY: float = np.sum(np.square(X)) - self.C
+            self.CV: float = np.sum(np.square(self.V)) / self.n - self.C
+        else:
+            # Пропущені ділянки (NaN): кількість спостережень кожного варіанту береться з маски,
+            # варіанти без жодного спостереження не враховуються
+            Z = np.where(mask, X, 0.0)
+            self.counts = np.sum(mask, axis=1)
+            present = self.counts > 0
+            self.l = int(np.count_nonzero(present))
+            self.N = int(np.sum(self.counts))
+            self.V = np.sum(Z, axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self.means = self.V / self.counts
+            self.avg = np.sum(Z) / self.N
+
+            self.C = pow(np.sum(Z), 2) / self.N
+            self.CY = np.sum(np.square(Z)) - self.C
+            if np.all(self.counts == self.counts[0]):
+                self.n = int(self.counts[0])
+                self.CV = np.sum(np.square(self.V)) / self.n - self.C
+            else:
+                self.n = self.l / np.sum(1 / self.counts[present])  # Середнє гармонічне кількостей
+                self.CV = np.sum(np.square(self.V[present]) / self.counts[present]) - self.C
+        self.CZ: float = self.CY - self.CV
+        self.s2v: float = self.CV / (self.l - 1)  # Середній квадрат варіантів
+        self.s2: float = self.CZ / (self.N - self.l)  # Середній квадрат помилки
+        self.v: float = 100 * math.sqrt(self.s2) / self.avg  # Коефіцієнт варіації, %
+
+        self.sx: float = math.sqrt(self.s2 / self.n)  # Помилка досліду
+        self.sd: float = math.sqrt(2 * self.s2 / self.n)  # Помилка різниці середніх
+        self.sd_percent: float = 100 * self.sd / self.avg  # Відносна помилка різниці середніх
+
+        self.Ff: float = self.s2v / self.s2
+        self.F05: float = ft.f05_distr(self.l - 1, self.N - self.l)
+        self.t05: float = ft.t_crit(0.95, self.N - self.l)
+
+        self.HCP05: float = self.t05 * self.sd
+        self.HCP05_percent: float = (self.HCP05 * 100) / self.avg
+
+    def posthoc(self, method='lsd', alpha=0.05):
+        from posthoc import pairwise
+        return pairwise(self.means, self.s2, self.n, self.N - self.l, method, alpha)
+
+    def permutationTest(self, permutations=10_000, seed=None, workers=None) -> dict:
+        from resampling import permutationTest
+        return permutationTest(self.X, permutations, seed, workers)
+
+    def bootstrap(self, resamples=10_000, level=0.95, seed=None, workers=None) -> dict:
+        from resampling import bootstrap
+        return bootstrap(self.X, resamples, level, seed, workers)
+
+    def roundVals(self, n):
+        self.avg = round(self.avg, n)
+        self.CY = round(self.CY, n)
+        self.CV = round(self.CV, n)
+        self.CZ = round(self.CZ, n)
+        self.s2 = round(self.s2, n)
+        self.s2v = round(self.s2v, n)
+        self.sx = round(self.sx, n)
+        self.sd = round(self.sd, n)
+        self.sd_percent = round(self.sd_percent, n)
+        self.Ff = round(self.Ff, n)
+        self.F05 = round(self.F05, n)
+        self.v = round(self.v, n)
+        self.HCP05 = round(self.HCP05, n)
+        self.HCP05_percent = round(self.HCP05_percent, n)
+
+    @profiling.timed('toMarkdown')
+    def toMarkdown(self) -> str:
+        import report
+        return report.toText(self)
+
+    def render(self, fmt='text') -> str:
+        import report
+        return report.render(self, fmt)
+
+    @profiling.timed('toExcel')
+    def toExcel(self, path='result.xlsx'):
+        from excel_export import ExcelExporter
+        with ExcelExporter(path) as exporter:
+            exporter.add(self)
+
+    def toExcelBytes(self) -> bytes:
+        import io
+        buffer = io.BytesIO()
+        self.toExcel(buffer)
+        return buffer.getvalue()
@@ -0,0 +1,134 @@
+import re
+
+import xlsxwriter
+
+SHEET_NAME_MAX = 31
+STACK_GAP = 3  # Порожні рядки між дослідами в режимі 'stacked'
+# У constant_memory кожен аркуш тримає відкритий тимчасовий файл до close(), тож кількість аркушів
+# обмежена з запасом до ліміту дескрипторів (1024 у Linux, 512 у CRT Windows)
+MAX_SHEETS = 200
+
+
+class ExcelExporter:
+    """Write many analyses into one workbook without building DataFrames.
+
+    The workbook is opened in xlsxwriter's ``constant_memory`` mode, so each
+    row is flushed to disk as soon as the next one starts and memory stays
+    bounded however many trials are written. ``layout='sheets'`` puts
+    ``per_sheet`` trials (default one) on each sheet, ``layout='stacked'``
+    writes them one under another on a single sheet. Each sheet keeps a temp
+    file open until ``close``, so past ``MAX_SHEETS`` sheets further trials
+    are stacked onto the last one. Formats are created once per workbook.
+    """
+
+    def __init__(self, path='result.xlsx', layout='sheets', per_sheet=1):
+        if layout not in ('sheets', 'stacked'):
+            raise ValueError(f'Unknown layout: {layout}')
+        self.layout = layout
+        self.per_sheet = per_sheet
+        self.blocks = 0  # Дослідів на поточному аркуші
+        options = {'constant_memory': True, 'nan_inf_to_errors': True}
+        if hasattr(path, 'write'):
+            options['in_memory'] = True  # Файлоподібний об'єкт (BytesIO): книга збирається в пам'яті
+        else:
+            path = str(path)
+        self.workbook = xlsxwriter.Workbook(path, options)
+        self.format_cells = self.workbook.add_format({'align': 'center', 'valign': 'vcenter', 'font_size': 10,
+                                                     'text_wrap': True})
+        self.format_right = self.workbook.add_format({'align': 'right', 'valign': 'vcenter', 'font_size': 10,
+                                                     'text_wrap': True})
+        self.format_header = self.workbook.add_format({'align': 'center', 'valign': 'vcenter', 'font_size': 10,
+                                                      'text_wrap': True, 'bold': True, 'border': 1})
+        self.names = set()
+        self.sheet = None
+        self.row = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.sheet is None:
+            self.newSheet('Sheet1')
+        self.workbook.close()
+
+    def sheetName(self, name) -> str:
+        name = re.sub(r'[\[\]:*?/\\]', '_', str(name))[:SHEET_NAME_MAX] or 'Sheet'
+        base, k = name, 1
+        while name.lower() in self.names:
+            suffix = f' ({k})'
+            name = base[:SHEET_NAME_MAX - len(suffix)] + suffix
+            k += 1
+        self.names.add(name.lower())
+        return name
+
+    def newSheet(self, name):
+        self.sheet = self.workbook.add_worksheet(self.sheetName(name))
+        self.sheet.set_column(0, 0, 18, self.format_cells)
+        self.sheet.set_column(2, 99, None, self.format_cells)
+        self.row = 0
+        self.blocks = 0
+
+    def add(self, disp, name=None):
+        """Append one ``DispOutput`` as a block laid out like ``DispOutput.toExcel``."""
+        if self.sheet is None or (self.layout == 'sheets' and self.blocks >= self.per_sheet
+                                  and len(self.names) < MAX_SHEETS):
+            self.newSheet(name or f'Sheet{len(self.names) + 1}')
+            if self.per_sheet > 1 and name is not None:
+                self.sheet.write(self.row, 0, str(name), self.format_header)
+                self.row += 1
+        elif name is not None:
+            self.sheet.write(self.row, 0, str(name), self.format_header)
+            self.row += 1
+        self.writeBlock(disp, self.row)
+        self.row += len(disp.X) + 18 + STACK_GAP
+        self.blocks += 1
+
+    def writeBlock(self, d, top):
+        ws, cells, right, header = self.sheet, self.format_cells, self.format_right, self.format_header
+        l, n = d.X.shape  # Рядки й стовпці таблиці; d.l і d.n без порожніх варіантів і клітинок
+
+        ws.set_row(top, 30)
+        ws.write_row(top, 0, ['Варіанти', *(str(i + 1) for i in range(n)), 'К-ть спост.', 'Суми', 'Середні'], header)
+        for i in range(l):
+            ws.write_string(top + i + 1, 0, str(i + 1), cells)
+            ws.write_row(top + i + 1, 1, [None if x != x else x for x in d.X[i].tolist()], cells)
+            ws.write_row(top + i + 1, n + 1, [int(d.counts[i]), float(d.V[i]), float(d.means[i])], cells)
+
+        ws.merge_range(top + l + 1, 0, top + l + 1, n, 'Загальна сума', right)
+        ws.write_row(top + l + 1, n + 1, [int(d.N), round(float(d.V.sum()), 2), float(d.avg)], cells)
+
+        ws.set_row(top + l + 4, 30)
+        ws.write_row(top + l + 4, 0, ['Дисперсія', 'Сума квадратів', 'Ступені свободи', 'Середній квадрат',
+                                      'Fф', 'F05'], header)
+        ws.write_row(top + l + 5, 0, ['Загальна', float(d.CY), int(d.N - 1), '--', '--', '--'], cells)
+        ws.write_row(top + l + 6, 0, ['Варіантів', float(d.CV), int(d.l - 1), float(d.s2v), float(d.Ff),
+                                      float(d.F05)], cells)
+        ws.write_row(top + l + 7, 0, ['Залишок (помилки)', float(d.CZ), int(d.N - d.l), float(d.s2), '--', '--'],
+                     cells)
+
+        summary = [('Критерій суттєвості', d.Ff),
+                   ('Критерій F на 5%-му рівні значимості', d.F05),
+                   ('Помилка досліду', d.sx),
+                   ('Помилка різниці середніх', d.sd),
+                   ('Відносна помилка різниці середніх (%)', d.sd_percent),
+                   ('Коефіцієнт варіації', d.v),
+                   ('НІР абсолютне', d.HCP05),
+                   ('НІР відносне (%)', d.HCP05_percent)]
+        for k, (label, value) in enumerate(summary):
+            ws.merge_range(top + l + 10 + k, 0, top + l + 10 + k, n, label, right)
+            ws.write_number(top + l + 10 + k, n + 1, float(value), cells)
+
+
+def exportMany(path, analyses, names=None, layout='sheets'):
+    """Write an iterable of ``DispOutput`` objects (consumed lazily) into one workbook.
+
+    With ``names`` the trial count is known up front, so for ``layout='sheets'``
+    the trials are spread evenly over at most ``MAX_SHEETS`` sheets.
+    """
+    per_sheet = -(-len(names) // MAX_SHEETS) if names else 1
+    with ExcelExporter(path, layout, max(per_sheet, 1)) as exporter:
+        for k, disp in enumerate(analyses):
+            exporter.add(disp, names[k] if names is not None else None)
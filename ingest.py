@@ -0,0 +1,96 @@
+import sys
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import anova
+
+CHUNK_SIZE = 500_000
+COMPACT_EVERY = 16  # Скільки часткових агрегатів тримати перед злиттям
+
+
+def readChunks(path, trial='trial', variant='variant', value='value', chunksize=CHUNK_SIZE, **kwargs):
+    """Yield DataFrame chunks of a long-format CSV or Parquet file.
+
+    Only the trial, variant and value columns are read; the replicate
+    column is not needed for the sufficient statistics.
+    """
+    path = Path(path)
+    columns = [trial, variant, value]
+    if path.suffix.lower() in ('.parquet', '.pq'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize, **kwargs)
+
+
+class StreamStats:
+    """Per-(trial, variant) sums, sums of squares and counts accumulated chunk by chunk."""
+
+    def __init__(self, trial='trial', variant='variant', value='value'):
+        self.keys = [trial, variant]
+        self.value = value
+        self.parts = []
+
+    def add(self, chunk: pd.DataFrame):
+        values = pd.to_numeric(chunk[self.value], errors='coerce')
+        chunk = chunk[self.keys].assign(value=values, square=np.square(values))
+        part = chunk.groupby(self.keys, sort=False).agg(sum=('value', 'sum'),
+                                                        sumsq=('square', 'sum'),
+                                                        count=('value', 'count'))
+        self.parts.append(part)
+        if len(self.parts) >= COMPACT_EVERY:
+            self.compact()
+
+    def compact(self) -> pd.DataFrame:
+        if not self.parts:
+            return pd.DataFrame(columns=['sum', 'sumsq', 'count'])
+        if len(self.parts) > 1:
+            self.parts = [pd.concat(self.parts).groupby(level=[0, 1], sort=False).sum()]
+        return self.parts[0]
+
+    def toOutput(self):
+        """Return ``(trial_ids, BatchOutput)`` with trials in sorted order.
+
+        Missing or non-numeric values are not counted, so variants may have
+        unequal numbers of replicates.
+        """
+        stats = self.compact().sort_index()
+        codes, trial_ids = pd.factorize(stats.index.get_level_values(0))
+        sums = stats['sum'].to_numpy(dtype=float)
+        sumsqs = stats['sumsq'].to_numpy(dtype=float)
+        counts = stats['count'].to_numpy()
+
+        l = np.bincount(codes)
+        starts = np.concatenate([[0], np.cumsum(l)[:-1]])
+        parts, indices = [], []
+        for L in np.unique(l):
+            selected = np.flatnonzero(l == L)
+            rows = starts[selected, None] + np.arange(L)
+            V = sums[rows]
+            parts.append(anova.BatchOutput(np.sum(V, axis=1), np.sum(sumsqs[rows], axis=1), V, counts[rows]))
+            indices.append(selected)
+        order = np.argsort(np.concatenate(indices), kind='stable')
+        return trial_ids.tolist(), anova.concatOutputs(parts, order)
+
+
+def analyzeFile(path, trial='trial', variant='variant', value='value', chunksize=CHUNK_SIZE, **kwargs):
+    """Stream a long-format file and compute the one-way ANOVA of every trial in it."""
+    stats = StreamStats(trial, variant, value)
+    for chunk in readChunks(path, trial, variant, value, chunksize, **kwargs):
+        stats.add(chunk)
+    return stats.toOutput()
+
+
+def main():
+    for path in sys.argv[1:]:
+        trial_ids, out = analyzeFile(path)
+        for i, trial_id in enumerate(trial_ids):
+            print(json.dumps(anova.jsonSafe({'trial': trial_id, **out[i]}), ensure_ascii=False, default=str))
+
+
+if __name__ == '__main__':
+    main()
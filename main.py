@@ -1,17 +1,23 @@
 import sys
 
-from PyQt6 import QtCore, QtWidgets
+from PyQt6 import QtCore, QtGui, QtWidgets
 from PyQt6.QtWidgets import QApplication, QMainWindow
 from ui.main_window import Ui_MainWindow
 from ui.result_window import Ui_SubWindow
 
-import math
 import numpy as np
-import json
-import pandas as pd
 from pathlib import Path
 
-import fisher_tables as ft
+from disp_output import DispOutput
+from accumulator import VariantStats
+from matrix_model import MatrixModel
+from planner_panel import PlannerWindow
+from result_cache import ResultCache, matrixKey
+from autosave import AutoSaver, loadSnapshot
+import profiling
+
+RECALC_DELAY = 300  # Затримка перерахунку після редагування, мс
+CFG_PATH = Path.home() / Path('.variance-analysis-cfg')
 
 
 class MainWindow(QMainWindow, Ui_MainWindow):
@@ -29,23 +35,100 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # Button Event
         self.pushButton.clicked.connect(self.showResults)
 
-        self.loadConfigs()
+        # Data grid
+        self.model = MatrixModel(self.rows.value(), self.cols.value(), self)
+        self.table.setModel(self.model)
+        self.model.valueChanged.connect(self.valueChanged)
+        self.model.matrixChanged.connect(self.matrixChanged)
+        self.pasteShortcut = QtGui.QShortcut(QtGui.QKeySequence.StandardKey.Paste, self.table)
+        self.pasteShortcut.activated.connect(self.pasteFromClipboard)
+
+        # Кеш результатів: повторний аналіз і експорт тих самих даних не перераховуються
+        self.cache = ResultCache()
+
+        # Live mode
+        self.stats = VariantStats.fromMatrix(self.model.matrix())
+        self.generation = 0
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.recalcTimer = QtCore.QTimer(self)
+        self.recalcTimer.setSingleShot(True)
+        self.recalcTimer.setInterval(RECALC_DELAY)
+        self.recalcTimer.timeout.connect(self.recalculate)
+        self.liveCheck = QtWidgets.QCheckBox('Автоперерахунок')
+        self.liveCheck.toggled.connect(self.scheduleRecalculation)
+        self.statusBar().addPermanentWidget(self.liveCheck)
+
+        # Планування наступного досліду за дисперсією помилки поточного
+        self.planner = PlannerWindow()
+        self.planButton = QtWidgets.QPushButton('Планування')
+        self.planButton.clicked.connect(self.showPlanner)
+        self.statusBar().addPermanentWidget(self.planButton)
+
+        # Збереження у фоні; конфігурація читається вже після першого відмальовування вікна
+        self.autosaver = AutoSaver(CFG_PATH, default=jsonDefault)
+        self.restored = False
+        self.updateTableSize()
+        QtCore.QTimer.singleShot(0, self.loadConfigs)
 
     def updateTable(self):
-        _translate = QtCore.QCoreApplication.translate
-        col = self.cols.value()
-        row = self.rows.value()
-        self.table.setColumnCount(col)
-        self.table.setRowCount(row)
+        self.model.resize(self.rows.value(), self.cols.value())
         self.updateTableSize()
-        for i in range(0, col):
-            item = QtWidgets.QTableWidgetItem()
-            item.setText(f'повт {i + 1}')
-            self.table.setHorizontalHeaderItem(i, item)
-        for i in range(0, row):
-            item = QtWidgets.QTableWidgetItem()
-            item.setText(f'вар {i + 1}')
-            self.table.setVerticalHeaderItem(i, item)
+
+    def valueChanged(self, row, col, old, new):
+        self.stats.replace(row, old, new)
+        self.showLiveSummary()
+        self.scheduleRecalculation()
+        self.saveConfigs()
+
+    def matrixChanged(self):
+        self.stats = VariantStats.fromMatrix(self.model.matrix())
+        self.showLiveSummary()
+        self.scheduleRecalculation()
+        self.saveConfigs()
+
+    def pasteFromClipboard(self):
+        index = self.table.currentIndex()
+        text = QtWidgets.QApplication.clipboard().text()
+        try:
+            self.model.pasteText(max(index.row(), 0), max(index.column(), 0), text)
+        except ValueError as e:
+            self.statusBar().showMessage(f'Некоректні дані в буфері обміну: {e}')
+
+    def showLiveSummary(self):
+        if not self.liveCheck.isChecked():
+            return
+        with np.errstate(all='ignore'):
+            out = self.stats.toOutput()
+        self.statusBar().showMessage(f'Fф = {out.Ff[0]:.2f}  F05 = {out.F05[0]:.2f}  НІР05 = {out.HCP05[0]:.2f}')
+
+    def scheduleRecalculation(self):
+        # Кожне редагування перезапускає таймер, тож рахується лише останній стан
+        if self.liveCheck.isChecked():
+            self.recalcTimer.start()
+
+    def recalculate(self):
+        self.generation += 1
+        task = AnalysisTask(self.generation, self.getMatrix().copy(), self.isCurrent, self.cache)
+        task.signals.finished.connect(self.resultsReady)
+        task.signals.failed.connect(self.resultsFailed)
+        self.pool.start(task)
+
+    def isCurrent(self, generation) -> bool:
+        return generation == self.generation
+
+    def resultsReady(self, generation, text):
+        if generation != self.generation:
+            return  # Результат застарів: дані вже змінились
+        self.sub_ui.textEdit.setText(text)
+        if profiling.enabled:
+            self.sub_window.statusBar().showMessage(profiling.summaryText())
+        if self.liveCheck.isChecked() and not self.sub_window.isVisible():
+            self.sub_window.show()
+
+    def resultsFailed(self, generation, message):
+        if generation == self.generation:
+            self.statusBar().showMessage(message)
 
     def updateTableSize(self):
         col = self.cols.value()
@@ -53,21 +136,18 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.table.setFixedSize(45 + col * 50, 25 + row * 21)
         self.resize(90 + col * 50, 180 + row * 21)
 
+    @profiling.timed('saveConfigs')
     def saveConfigs(self):
-        cfg_path = Path.home() / Path('.variance-analysis-cfg')
-        cfg = {'rows': self.rows.value(),
-               'cols': self.cols.value(),
-               'cells': self.getMatrix().round(2).tolist()
-               }
-        with open(cfg_path, 'w') as f:
-            json_string = json.dumps(cfg, default=lambda o: o.__dict__, sort_keys=True, indent=2)
-            f.write(json_string)
+        if not self.restored:
+            return  # Не перезаписувати збережену сесію порожньою сіткою до її відновлення
+        # Копія матриці: у JSON вона перетворюється вже у фоновому потоці
+        self.autosaver.submit({'rows': self.rows.value(),
+                               'cols': self.cols.value(),
+                               'cells': self.getMatrix().copy()})
 
     def loadConfigs(self):
-        cfg_path = Path.home() / Path('.variance-analysis-cfg')
-        if cfg_path.exists():
-            with open(cfg_path) as json_file:
-                cfg = json.load(json_file)
+        cfg, source = loadSnapshot(CFG_PATH)
+        if cfg is not None:
             try:
                 self.rows.setValue(cfg['rows'])
             except KeyError as e:
@@ -81,199 +161,93 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 self.writeCells(values)
             except KeyError as e:
                 print("Missing attribute in .cfg file:", e)
+            if source != CFG_PATH:
+                self.statusBar().showMessage(f'Сесію відновлено з резервної копії {source.name}')
+        self.restored = True
         self.updateTableSize()
 
+    def closeEvent(self, event):
+        self.autosaver.close()  # Дописує відкладений знімок
+        QMainWindow.closeEvent(self, event)
+
+    @profiling.timed('getMatrix')
     def getMatrix(self) -> np.ndarray:
-        rows = self.table.rowCount()
-        cols = self.table.columnCount()
-        matrix = np.zeros([rows, cols])
-        for col in range(0, self.table.columnCount()):
-            for row in range(0, self.table.rowCount()):
-                item = self.table.item(row, col)
-                if item:
-                    matrix[row, col] = float(item.text().replace(',', '.'))
-        return matrix
+        return self.model.matrix()
 
     def writeCells(self, data: list):
-        rows = self.table.rowCount()
-        cols = self.table.columnCount()
-        for row in range(0, rows):
-            for col in range(0, cols):
-                text = str(data[row][col])
-                item = QtWidgets.QTableWidgetItem()
-                item.setText(text)
-                self.table.setItem(row, col, item)
+        rows = self.model.rowCount()
+        cols = self.model.columnCount()
+        self.model.writeBlock(0, 0, np.asarray(data, dtype=float)[:rows, :cols])
 
+    @profiling.timed('exportToExcel')
     def exportToExcel(self):
-        disp = DispOutput(self.getMatrix())
-        disp.roundVals(2)
-        disp.toExcel()
+        X = self.getMatrix()
+        data = self.cache.getOrCompute(matrixKey(X, 'excel', digits=2),
+                                       lambda: analyze(self.cache, X, 2).toExcelBytes())
+        Path('result.xlsx').write_bytes(data)
+        if profiling.enabled:
+            self.sub_window.statusBar().showMessage(profiling.summaryText())
+
+    def showPlanner(self):
+        try:
+            with np.errstate(all='ignore'):
+                disp = self.cache.getOrCompute(matrixKey(self.getMatrix(), 'stats'), lambda: DispOutput(self.getMatrix()))
+            self.planner.setTrial(float(disp.s2), float(disp.avg))
+        except (ValueError, ZeroDivisionError, IndexError):
+            self.planner.replan()  # Матриця ще не заповнена: лишаються попередні параметри
+        self.planner.show()
 
     def showResults(self):
-        disp = DispOutput(self.getMatrix())
-        disp.roundVals(2)
+        self.recalcTimer.stop()
+        self.recalculate()
         self.sub_window.show()
-        self.sub_ui.textEdit.setText(disp.toMarkdown())
         self.saveConfigs()
 
 
-class DispOutput:
-    def __init__(self, X):
-        self.X: np.ndarray = X
-
-        self.l: int = np.shape(X)[0]  # Число варіантів
-        self.n: int = np.shape(X)[1]  # Число спостережень
-        self.N: int = np.size(X)  # Загальна кількість спостережень
-        self.V: np.ndarray = np.sum(X, axis=1)  # Суми
-        self.avg: float = np.average(X)
-
-        self.C: float = pow(np.sum(X), 2) / self.N
-        self.CY: float = np.sum(np.square(X)) - self.C
-        self.CV: float = np.sum(np.square(self.V)) / self.n - self.C
-        self.CZ: float = self.CY - self.CV
-        self.s2v: float = self.CV / (self.l - 1)  # Середній квадрат варіантів
-        self.s2: float = self.CZ / (self.N - self.l)  # Середній квадрат помилки
-        self.v: float = 100 * math.sqrt(self.s2) / self.avg  # Коефіцієнт варіації, %
-
-        self.sx: float = math.sqrt(self.s2 / self.n)  # Помилка досліду
-        self.sd: float = math.sqrt(2 * self.s2 / self.n)  # Помилка різниці середніх
-        self.sd_percent: float = 100 * self.sd / self.avg  # Відносна помилка різниці середніх
-
-        self.Ff: float = self.s2v / self.s2
-        self.F05: float = ft.f05_distr(self.n, self.N - self.l)
-        self.t05: float = ft.t_crit(0.95, self.N - self.l)
-
-        self.HCP05: float = self.t05 * self.sd
-        self.HCP05_percent: float = (self.HCP05 * 100) / self.avg
-
-    def roundVals(self, n):
-        self.avg = round(self.avg, n)
-        self.CY = round(self.CY, n)
-        self.CV = round(self.CV, n)
-        self.CZ = round(self.CZ, n)
-        self.s2 = round(self.s2, n)
-        self.s2v = round(self.s2v, n)
-        self.sx = round(self.sx, n)
-        self.sd = round(self.sd, n)
-        self.sd_percent = round(self.sd_percent, n)
-        self.Ff = round(self.Ff, n)
-        self.F05 = round(self.F05, n)
-        self.v = round(self.v, n)
-        self.HCP05 = round(self.HCP05, n)
-        self.HCP05_percent = round(self.HCP05_percent, n)
-
-    def toMarkdown(self) -> str:
-        columns = ['Варіанти']
-        for i in range(0, self.n):
-            columns.append(str(i + 1))
-        columns.append('К-ть\nспост.')
-        columns.append('Суми')
-        columns.append('Середні')
-        body = []
-        for i in range(0, self.l):
-            row = list(self.X[i])
-            row.insert(0, str(i + 1))
-            row.append(self.n)
-            row.append(self.V[i])
-            row.append(np.average(self.X, axis=1)[i])
-            body.append(row)
-        table = pd.DataFrame(body, columns=columns)
-        text = table.to_markdown(index=False,
-                                 tablefmt='fancy_grid',
-                                 floatfmt=".2f",
-                                 stralign="center",
-                                 numalign='center')
-        text += f'\n\nЗагальна кількіть спостережень: {self.N}'
-        text += f'\nЗагальна сума: {round(self.V.sum(), 2)}'
-        text += f'\nСереднє по досліду: {self.avg}'
-
-        columns = ['Дисперсія', 'Сума\nквадратів', 'Ступені\nсвободи', 'Середній\nквадрат', 'Fф', 'F05']
-        body = [['Загальна', self.CY, self.N - 1, '--', '--', '--'],
-                ['Варіантів', self.CV, self.l - 1, self.s2v, self.Ff, self.F05],
-                ['Залишок (помилки)', self.CZ, self.N - self.l, self.s2, '--', '--']]
-        table = pd.DataFrame(body, columns=columns)
-
-        text += '\n\nРезультати дисперсійного аналізу\n'
-        text += table.to_markdown(index=False,
-                                  tablefmt='fancy_grid',
-                                  floatfmt=".2f",
-                                  stralign="center",
-                                  numalign='center')
-
-        text += '\n\n'
-        text += f'Критерій суттєвості: {self.Ff}\n'
-        text += f'Критерій F на 5%-му рівні значимості: {self.F05}\n'
-        text += f'Помилка досліду: {self.sx}\n'
-        text += f'Помилка різниці середніх: {self.sd}\n'
-        text += f'Відносна помилка різниці середніх: {self.sd_percent}%\n'
-        text += f'Коефіцієнт варіації: {self.v}%\n'
-        text += f'НІР абсолютне: {self.HCP05}\n'
-        text += f'НІР відносне: {self.HCP05_percent}%'
-
-        return text
-
-    def toExcel(self):
-        columns = ['Варіанти']
-        for i in range(0, self.n):
-            columns.append(str(i + 1))
-        columns.append('К-ть спост.')
-        columns.append('Суми')
-        columns.append('Середні')
-        body = []
-        for i in range(0, self.l):
-            row = list(self.X[i])
-            row.insert(0, str(i + 1))
-            row.append(self.n)
-            row.append(self.V[i])
-            row.append(np.average(self.X, axis=1)[i])
-            body.append(row)
-        table_01 = pd.DataFrame(body, columns=columns)
-
-        head = ['Дисперсія', 'Сума квадратів', 'Ступені свободи', 'Середній квадрат', 'Fф', 'F05']
-        body = [['Загальна', self.CY, self.N - 1, '--', '--', '--'],
-                ['Варіантів', self.CV, self.l - 1, self.s2v, self.Ff, self.F05],
-                ['Залишок (помилки)', self.CZ, self.N - self.l, self.s2, '--', '--']]
-        table_02 = pd.DataFrame(body, columns=head)
-
-        writer = pd.ExcelWriter("result.xlsx", engine='xlsxwriter')
-        table_01.to_excel(writer, index=False, startrow=0)
-        table_02.to_excel(writer, index=False, startrow=self.l + 4)
-
-        workbook = writer.book
-        worksheet = writer.sheets['Sheet1']
-
-        format_cells = workbook.add_format({'align': 'center', 'valign': 'vcenter', 'font_size': 10, 'text_wrap': True})
-        format_right = workbook.add_format({'align': 'right', 'valign': 'vcenter', 'font_size': 10, 'text_wrap': True})
-        format_header = workbook.add_format({'align': 'center', 'valign': 'vcenter', 'font_size': 10, 'text_wrap': True})
-
-        worksheet.set_column(0, 0, 18, format_cells)
-        worksheet.set_column(2, 99, None, format_cells)
-        worksheet.set_row(0, 30, format_header)
-        worksheet.set_row(self.l + 4, 30, format_header)
-
-        worksheet.merge_range(self.l + 1, 0, self.l + 1, self.n, 'Загальна сума', format_right)
-        worksheet.write(self.l + 1, self.n + 1, self.N, format_cells)
-        worksheet.write(self.l + 1, self.n + 2, round(self.V.sum(), 2), format_cells)
-        worksheet.write(self.l + 1, self.n + 3, self.avg, format_cells)
-
-        worksheet.merge_range(self.l + 10, 0, self.l + 10, self.n, 'Критерій суттєвості', format_right)
-        worksheet.write(self.l + 10, self.n + 1, self.Ff, format_cells)
-        worksheet.merge_range(self.l + 11, 0, self.l + 11, self.n, 'Критерій F на 5%-му рівні значимості', format_right)
-        worksheet.write(self.l + 11, self.n + 1, self.F05, format_cells)
-        worksheet.merge_range(self.l + 12, 0, self.l + 12, self.n, 'Помилка досліду', format_right)
-        worksheet.write(self.l + 12, self.n + 1, self.sx, format_cells)
-        worksheet.merge_range(self.l + 13, 0, self.l + 13, self.n, 'Помилка різниці середніх', format_right)
-        worksheet.write(self.l + 13, self.n + 1, self.sd, format_cells)
-        worksheet.merge_range(self.l + 14, 0, self.l + 14, self.n, 'Відносна помилка різниці середніх (%)', format_right)
-        worksheet.write(self.l + 14, self.n + 1, self.sd_percent, format_cells)
-        worksheet.merge_range(self.l + 15, 0, self.l + 15, self.n, 'Коефіцієнт варіації', format_right)
-        worksheet.write(self.l + 15, self.n + 1, self.v, format_cells)
-        worksheet.merge_range(self.l + 16, 0, self.l + 16, self.n, 'НІР абсолютне', format_right)
-        worksheet.write(self.l + 16, self.n + 1, self.HCP05, format_cells)
-        worksheet.merge_range(self.l + 17, 0, self.l + 17, self.n, 'НІР відносне (%)', format_right)
-        worksheet.write(self.l + 17, self.n + 1, self.HCP05_percent, format_cells)
-
-        writer.save()
+def cellsToJson(X: np.ndarray) -> list:
+    # Порожні клітинки (NaN) зберігаються як null
+    cells = X.round(2).astype(object)
+    cells[np.isnan(X)] = None
+    return cells.tolist()
+
+
+def jsonDefault(o):
+    if isinstance(o, np.ndarray):
+        return cellsToJson(o)
+    raise TypeError(f'{type(o).__name__} is not JSON serializable')
+
+
+def analyze(cache: ResultCache, X: np.ndarray, digits: int) -> DispOutput:
+    # Кеш повертає копію, тож округлення не псує збережений результат
+    disp = cache.getOrCompute(matrixKey(X, 'stats'), lambda: DispOutput(X))
+    disp.roundVals(digits)
+    return disp
+
+
+class AnalysisSignals(QtCore.QObject):
+    finished = QtCore.pyqtSignal(int, str)
+    failed = QtCore.pyqtSignal(int, str)
+
+
+class AnalysisTask(QtCore.QRunnable):
+    def __init__(self, generation: int, X: np.ndarray, isCurrent, cache: ResultCache):
+        QtCore.QRunnable.__init__(self)
+        self.generation = generation
+        self.X = X
+        self.isCurrent = isCurrent
+        self.cache = cache
+        self.signals = AnalysisSignals()
+
+    def run(self):
+        if not self.isCurrent(self.generation):
+            return  # Задачу витіснило новіше редагування ще в черзі
+        try:
+            text = self.cache.getOrCompute(matrixKey(self.X, 'markdown', digits=2),
+                                           lambda: analyze(self.cache, self.X, 2).toMarkdown())
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+        else:
+            self.signals.finished.emit(self.generation, text)
 
 
 def main():
@@ -283,4 +257,5 @@ def main():
     sys.exit(app.exec())
 
 
-main()
+if __name__ == '__main__':
+    main()
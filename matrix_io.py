@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+CFG_NAME = '.variance-analysis-cfg'
+MISSING = ('', 'na', 'nan')  # Позначення пропущених клітинок у текстових файлах
+
+
+def readMatrix(path) -> np.ndarray:
+    """Read one variants x replicates matrix from a config JSON, XLSX or delimited text file.
+
+    In text files separated by ';' or tabs a comma is treated as the decimal
+    separator, as in the GUI. Empty cells, ``NA`` and ``nan`` are missing
+    plots and become NaN.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if path.name == CFG_NAME or suffix in ('.json', '.cfg'):
+        with open(path) as f:
+            return np.asarray(json.load(f)['cells'], dtype=float)
+    if suffix in ('.xlsx', '.xls'):
+        import pandas as pd
+        return pd.read_excel(path, header=None).to_numpy(dtype=float)
+    text = path.read_text()
+    delimiter = None  # Пробіли
+    if ';' in text or '\t' in text:
+        delimiter = ';' if ';' in text else '\t'
+        text = text.replace(',', '.')
+    elif ',' in text:
+        delimiter = ','
+    rows = [line.split(delimiter) for line in text.splitlines() if line.strip()]
+    X = np.full([len(rows), max(map(len, rows), default=0)], np.nan)
+    for i, row in enumerate(rows):
+        X[i, :len(row)] = [float(cell) if cell.strip().lower() not in MISSING else np.nan for cell in row]
+    filled = np.flatnonzero(~np.isnan(X).all(axis=0))
+    return X[:, :filled[-1] + 1] if len(filled) else X  # Без порожніх стовпців від роздільника в кінці рядка
@@ -0,0 +1,119 @@
+import numpy as np
+from PyQt6 import QtCore
+from PyQt6.QtCore import Qt
+
+
+def parseValue(text: str) -> float:
+    # Порожня клітинка - пропущене спостереження (NaN)
+    text = text.strip().replace(',', '.')
+    return float(text) if text else np.nan
+
+
+class MatrixModel(QtCore.QAbstractTableModel):
+    """Table model that keeps the trial directly in a float NumPy array.
+
+    ``matrix()`` returns that array without copying; blank cells are NaN.
+    ``valueChanged`` is emitted for single-cell edits and ``matrixChanged``
+    after bulk writes (resize, load, paste).
+    """
+
+    valueChanged = QtCore.pyqtSignal(int, int, float, float)  # рядок, стовпець, було, стало
+    matrixChanged = QtCore.pyqtSignal()
+
+    def __init__(self, rows: int, cols: int, parent=None):
+        QtCore.QAbstractTableModel.__init__(self, parent)
+        self.X: np.ndarray = np.full([rows, cols], np.nan)
+
+    def matrix(self) -> np.ndarray:
+        return self.X
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.X.shape[0]
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.X.shape[1]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            value = self.X[index.row(), index.column()]
+            if np.isnan(value):
+                return ''
+            # У редакторі - точне значення, щоб Enter без змін не округлював дані
+            return f'{value:g}' if role == Qt.ItemDataRole.DisplayRole else repr(float(value)).removesuffix('.0')
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole:
+            return False
+        try:
+            value = parseValue(str(value))
+        except ValueError:
+            return False
+        row, col = index.row(), index.column()
+        old = self.X[row, col]
+        self.X[row, col] = value
+        self.dataChanged.emit(index, index)
+        self.valueChanged.emit(row, col, old, value)
+        return True
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsEditable
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return f'повт {section + 1}'
+        return f'вар {section + 1}'
+
+    def resize(self, rows: int, cols: int):
+        # Наявні значення зберігаються, нові клітинки порожні
+        old_rows, old_cols = self.X.shape
+        root = QtCore.QModelIndex()
+        if rows < old_rows:
+            self.beginRemoveRows(root, rows, old_rows - 1)
+            self.X = self.X[:rows].copy()
+            self.endRemoveRows()
+        elif rows > old_rows:
+            self.beginInsertRows(root, old_rows, rows - 1)
+            self.X = np.vstack([self.X, np.full([rows - old_rows, old_cols], np.nan)])
+            self.endInsertRows()
+        if cols < old_cols:
+            self.beginRemoveColumns(root, cols, old_cols - 1)
+            self.X = np.ascontiguousarray(self.X[:, :cols])
+            self.endRemoveColumns()
+        elif cols > old_cols:
+            self.beginInsertColumns(root, old_cols, cols - 1)
+            self.X = np.hstack([self.X, np.full([rows, cols - old_cols], np.nan)])
+            self.endInsertColumns()
+        if (rows, cols) != (old_rows, old_cols):
+            self.matrixChanged.emit()
+
+    def setMatrix(self, X):
+        self.beginResetModel()
+        self.X = np.array(X, dtype=float, ndmin=2)
+        self.endResetModel()
+        self.matrixChanged.emit()
+
+    def writeBlock(self, row: int, col: int, block):
+        """Write a 2-D block at (row, col) in one array assignment, clipped to the table."""
+        block = np.asarray(block, dtype=float)
+        h = min(block.shape[0], self.X.shape[0] - row)
+        w = min(block.shape[1], self.X.shape[1] - col)
+        if h <= 0 or w <= 0:
+            return
+        self.X[row:row + h, col:col + w] = block[:h, :w]
+        self.dataChanged.emit(self.index(row, col), self.index(row + h - 1, col + w - 1))
+        self.matrixChanged.emit()
+
+    def pasteText(self, row: int, col: int, text: str):
+        # Табличний фрагмент зі спредшиту: рядки через \n, клітинки через \t
+        lines = [line for line in text.splitlines() if line.strip()]
+        cells = [[parseValue(cell) for cell in line.split('\t')] for line in lines]
+        width = max((len(line) for line in cells), default=0)
+        block = np.full([len(cells), width], np.nan)
+        for i, line in enumerate(cells):
+            block[i, :len(line)] = line
+        self.writeBlock(row, col, block)
@@ -0,0 +1,113 @@
+import numpy as np
+
+import fisher_tables as ft
+import profiling
+
+DESIGNS = ('crd', 'block')
+
+
+def parseRange(text, dtype=float) -> np.ndarray:
+    """Axis values from ``a:b`` / ``a:b:step`` (inclusive) or a comma-separated list."""
+    try:
+        if ':' in text:
+            start, stop, *step = (float(part) for part in text.split(':'))
+            step = step[0] if step else 1
+            if step <= 0:
+                raise ValueError
+            values = np.arange(start, stop + step / 2, step)
+        else:
+            values = np.array([float(part) for part in text.split(',')])
+    except ValueError:
+        raise ValueError(f'bad range {text!r}, expected a:b[:step] or a list a,b,c')
+    return values.astype(dtype)
+
+
+class PowerGrid:
+    """Power of the variant F test and detectable differences over a planning grid.
+
+    Every combination of ``variants``, ``replicates``, ``alphas`` and
+    ``effects`` is one point; attributes are flat arrays with one entry per
+    point. ``effect`` is the smallest difference between two variants worth
+    detecting (in data units, or % of ``mean`` with ``relative=True``); power
+    is computed for the least favourable case where the other variants sit at
+    the grand mean, i.e. noncentrality r·δ²/(2·s2). ``HCP`` is the expected
+    НІР at that alpha and ``mdd`` the difference detected with probability
+    ``target``.
+    """
+
+    fields = ('l', 'r', 'alpha', 'effect', 'df1', 'df2', 'F_crit', 'power', 'HCP', 'HCP_percent', 'mdd')
+
+    @profiling.timed('PowerGrid')
+    def __init__(self, s2, variants, replicates, alphas=(0.05,), effects=(1.0,), mean=None,
+                 relative=False, design='crd', target=0.8):
+        if design not in DESIGNS:
+            raise ValueError(f'Unknown design {design!r}, expected one of {DESIGNS}')
+        if relative and mean is None:
+            raise ValueError('Relative effects need the trial mean')
+        from scipy.special import ncfdtr
+
+        self.s2 = float(s2)
+        self.mean = mean
+        self.target = target
+        # Осі сітки: варіанти x повторення x рівні значущості x ефекти
+        L = np.asarray(variants, dtype=int).reshape(-1, 1, 1, 1)
+        R = np.asarray(replicates, dtype=int).reshape(1, -1, 1, 1)
+        A = np.asarray(alphas, dtype=float).reshape(1, 1, -1, 1)
+        E = np.asarray(effects, dtype=float).reshape(1, 1, 1, -1)
+        self.shape = (L.size, R.size, A.size, E.size)
+        if min(self.shape) == 0 or L.min() < 2 or R.min() < 2:
+            raise ValueError('Planning needs at least 2 variants and 2 replicates on every axis')
+
+        df1 = L - 1
+        df2 = L * (R - 1) if design == 'crd' else (L - 1) * (R - 1)  # У блоковому досліді повторення - блоки
+        # Критичні значення залежать лише від (l, r, alpha), тож рахуються один раз на цій підсітці,
+        # а не для кожної з сотень тисяч точок
+        F_crit = ft.f_crit_array(A, df1, df2)
+        t_crit = ft.t_crit_array(1 - A, df2)
+        t_power = ft.t_crit_array(2 * target - 1, df2)  # Однобічний квантиль рівня target
+        se = np.sqrt(2 * self.s2 / R)  # Помилка різниці середніх
+        delta = E * mean / 100 if relative else E  # Різниця в одиницях урожаю
+
+        def flat(a):
+            return np.broadcast_to(a, self.shape).ravel()
+
+        self.l, self.r, self.alpha, self.effect = flat(L), flat(R), flat(A), flat(E)
+        self.df1: np.ndarray = flat(df1)
+        self.df2: np.ndarray = flat(df2)
+        self.F_crit: np.ndarray = flat(F_crit)
+        self.power: np.ndarray = flat(1 - ncfdtr(df1, df2, np.square(delta) * R / (2 * self.s2), F_crit))
+        self.HCP: np.ndarray = flat(t_crit * se)
+        self.HCP_percent: np.ndarray = 100 * self.HCP / mean if mean else np.full(len(self.HCP), np.nan)
+        self.mdd: np.ndarray = flat((t_crit + t_power) * se)
+
+    @classmethod
+    def fromOutput(cls, disp, variants, replicates, **kwargs):
+        """Plan from last season's analysis: its error variance and mean."""
+        return cls(float(disp.s2), variants, replicates, mean=float(disp.avg), **kwargs)
+
+    @classmethod
+    def fromCV(cls, cv, mean, variants, replicates, **kwargs):
+        """Plan from the coefficient of variation (%) and the trial mean."""
+        return cls(np.square(cv * mean / 100), variants, replicates, mean=mean, **kwargs)
+
+    def __len__(self):
+        return len(self.l)
+
+    def __getitem__(self, i) -> dict:
+        return {name: getattr(self, name)[i].item() for name in self.fields}
+
+    def table(self, name='power') -> np.ndarray:
+        """Values as a variants x replicates x alphas x effects array."""
+        return getattr(self, name).reshape(self.shape)
+
+    def minimalReplicates(self, target=None) -> np.ndarray:
+        """Smallest replicate count reaching ``target`` power for every (variants, alpha, effect).
+
+        Returns a variants x alphas x effects array; 0 where no replicate count
+        on the grid is enough.
+        """
+        enough = self.table() >= (self.target if target is None else target)
+        replicates = self.r.reshape(self.shape)
+        first = np.argmax(enough, axis=1)
+        found = np.take_along_axis(enough, first[:, None], axis=1)[:, 0]
+        return np.where(found, np.take_along_axis(replicates, first[:, None], axis=1)[:, 0], 0)
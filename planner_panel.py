@@ -0,0 +1,128 @@
+import numpy as np
+from PyQt6 import QtCore, QtGui, QtWidgets
+from PyQt6.QtCore import Qt
+
+from ui.planner_window import Ui_PlannerWindow
+from planner import PowerGrid, parseRange
+
+REPLAN_DELAY = 150  # Затримка перерахунку сітки після зміни параметрів, мс
+SHOWN = ('power', 'HCP', 'HCP_percent', 'mdd')  # У порядку пунктів списку "Показати"
+REACHED = QtGui.QColor(200, 235, 200)
+
+
+class GridModel(QtCore.QAbstractTableModel):
+    """Read-only variants x replicates slice of a ``PowerGrid``."""
+
+    def __init__(self, parent=None):
+        QtCore.QAbstractTableModel.__init__(self, parent)
+        self.values = np.empty([0, 0])
+        self.reached = np.zeros([0, 0], dtype=bool)
+        self.variants = self.replicates = np.empty(0, dtype=int)
+        self.percent = False
+
+    def setSlice(self, values, reached, variants, replicates, percent):
+        self.beginResetModel()
+        self.values, self.reached = values, reached
+        self.variants, self.replicates = variants, replicates
+        self.percent = percent
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.values.shape[0]
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.values.shape[1]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = self.values[index.row(), index.column()]
+            if np.isnan(value):
+                return ''
+            return f'{100 * value:.0f}' if self.percent else f'{value:.2f}'
+        if role == Qt.ItemDataRole.BackgroundRole and self.reached[index.row(), index.column()]:
+            return REACHED
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return f'{self.replicates[section]} повт'
+        return f'{self.variants[section]} вар'
+
+
+class PlannerWindow(QtWidgets.QWidget, Ui_PlannerWindow):
+    """Power and expected НІР over variants x replicates; cells reaching the target power are shaded."""
+
+    def __init__(self, parent=None):
+        QtWidgets.QWidget.__init__(self, parent)
+        self.setupUi(self)
+        self.grid = None
+        self.model = GridModel(self)
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setDefaultSectionSize(55)
+
+        self.replanTimer = QtCore.QTimer(self)
+        self.replanTimer.setSingleShot(True)
+        self.replanTimer.setInterval(REPLAN_DELAY)
+        self.replanTimer.timeout.connect(self.replan)
+        for box in (self.s2, self.mean, self.variantsFrom, self.variantsTo, self.replicatesFrom,
+                    self.replicatesTo, self.target):
+            box.valueChanged.connect(self.replanTimer.start)
+        self.alphas.textChanged.connect(self.replanTimer.start)
+        self.effects.textChanged.connect(self.replanTimer.start)
+        self.relative.toggled.connect(self.replanTimer.start)
+        self.design.currentIndexChanged.connect(self.replanTimer.start)
+        # Вибір зрізу лише перемальовує таблицю, сітка не перераховується
+        for box in (self.shown, self.alphaChoice, self.effectChoice):
+            box.currentIndexChanged.connect(self.showSlice)
+
+    def setTrial(self, s2, mean):
+        """Pre-fill the error variance and mean from an analysed trial."""
+        if np.isfinite(s2) and s2 > 0:
+            self.s2.setValue(s2)
+        if np.isfinite(mean):
+            self.mean.setValue(mean)
+        self.replan()
+
+    def replan(self):
+        self.replanTimer.stop()
+        mean = self.mean.value() or None
+        try:
+            variants = np.arange(self.variantsFrom.value(), max(self.variantsFrom.value(), self.variantsTo.value()) + 1)
+            replicates = np.arange(self.replicatesFrom.value(),
+                                   max(self.replicatesFrom.value(), self.replicatesTo.value()) + 1)
+            self.grid = PowerGrid(self.s2.value(), variants, replicates, alphas=parseRange(self.alphas.text()),
+                                  effects=parseRange(self.effects.text()), mean=mean,
+                                  relative=self.relative.isChecked(),
+                                  design=('crd', 'block')[self.design.currentIndex()], target=self.target.value())
+        except ValueError as e:
+            self.status.setText(str(e))
+            return
+        self.fillChoices(self.alphaChoice, self.grid.table('alpha')[0, 0, :, 0], 'α = {:g}')
+        self.fillChoices(self.effectChoice, self.grid.table('effect')[0, 0, 0, :],
+                         'Δ = {:g}%' if self.relative.isChecked() else 'Δ = {:g}')
+        self.showSlice()
+
+    def fillChoices(self, box, values, template):
+        index = box.currentIndex()
+        box.blockSignals(True)
+        box.clear()
+        box.addItems([template.format(value) for value in values])
+        box.setCurrentIndex(min(max(index, 0), len(values) - 1))
+        box.blockSignals(False)
+
+    def showSlice(self):
+        if self.grid is None:
+            return
+        a, e = max(self.alphaChoice.currentIndex(), 0), max(self.effectChoice.currentIndex(), 0)
+        name = SHOWN[self.shown.currentIndex()]
+        power = self.grid.table()[:, :, a, e]
+        self.model.setSlice(self.grid.table(name)[:, :, a, e], power >= self.grid.target,
+                            self.grid.table('l')[:, 0, 0, 0], self.grid.table('r')[0, :, 0, 0], name == 'power')
+        minimal = self.grid.minimalReplicates()[:, a, e]
+        reached = [f'{l} вар - {r} повт' for l, r in zip(self.model.variants, minimal) if r][:6]
+        self.status.setText(f'Потужність {self.grid.target:.0%} досягається: ' + ', '.join(reached)
+                            if reached else 'Бажана потужність не досягається на цій сітці')
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import atexit
+import threading
+import functools
+from pathlib import Path
+
+# Необов'язкові вимірювання часу етапів (getMatrix, DispOutput, fisher_tables, звіти, збереження).
+# Вмикаються змінною оточення VARIANCE_PROFILE або прапорцями CLI --profile / --profile-output FILE:
+#   VARIANCE_PROFILE=1            - лише зведення (рядок стану вікна результатів, stderr у CLI)
+#   VARIANCE_PROFILE=trace.json   - ще й Chrome trace (chrome://tracing, Perfetto)
+#   VARIANCE_PROFILE=trace.jsonl  - структурований журнал, по події на рядок
+# Вимкнені вимірювання коштують одну перевірку глобальної змінної.
+
+ENV = 'VARIANCE_PROFILE'
+MAX_EVENTS = 100_000  # Далі події лише підсумовуються, щоб довгий сеанс не з'їв пам'ять
+
+enabled = False
+output = None
+_start = time.perf_counter_ns()
+_events = []
+_totals = {}  # назва -> [кількість, сумарний час нс, найдовший нс]
+_counters = {}
+_lock = threading.Lock()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+class Span:
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.begin = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, self.begin, time.perf_counter_ns() - self.begin, self.args)
+        return False
+
+
+def span(name: str, **args):
+    """Context manager timing a stage; a shared no-op when profiling is off."""
+    if not enabled:
+        return _NULL
+    return Span(name, args)
+
+
+def timed(name: str):
+    """Decorator form of ``span``; the switch is checked on every call, not at import."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return fn(*args, **kwargs)
+            begin = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, begin, time.perf_counter_ns() - begin)
+        return wrapper
+    return decorate
+
+
+def record(name, begin, duration, args=None):
+    with _lock:
+        total = _totals.setdefault(name, [0, 0, 0])
+        total[0] += 1
+        total[1] += duration
+        total[2] = max(total[2], duration)
+        if len(_events) < MAX_EVENTS:
+            _events.append((name, begin, duration, threading.get_ident(), args or None))
+
+
+def count(name: str, n=1):
+    if enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def enable(path=None):
+    """Start collecting; ``path`` (.json - Chrome trace, інакше JSON Lines) is written at exit."""
+    global enabled, output
+    enabled = True
+    if path and path != '1':
+        if output is None:
+            atexit.register(save)
+        output = Path(path)
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _events.clear()
+        _totals.clear()
+        _counters.clear()
+
+
+def summary() -> dict:
+    with _lock:
+        spans = {name: {'count': c, 'total_ms': t / 1e6, 'max_ms': m / 1e6} for name, (c, t, m) in _totals.items()}
+        return {'spans': spans, 'counters': dict(_counters)}
+
+
+def summaryText() -> str:
+    data = summary()
+    parts = [f'{name}: {s["total_ms"]:.1f} мс ×{s["count"]}' for name, s in data['spans'].items()]
+    parts += [f'{name}: {value}' for name, value in data['counters'].items()]
+    return ' | '.join(parts)
+
+
+def writeChromeTrace(path):
+    pid = os.getpid()
+    with _lock:
+        events = [{'name': name, 'ph': 'X', 'ts': (begin - _start) / 1e3, 'dur': duration / 1e3,
+                   'pid': pid, 'tid': tid, **({'args': args} if args else {})}
+                  for name, begin, duration, tid, args in _events]
+        end = (time.perf_counter_ns() - _start) / 1e3
+        events += [{'name': name, 'ph': 'C', 'ts': end, 'pid': pid, 'args': {'value': value}}
+                   for name, value in _counters.items()]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def writeLog(path):
+    with _lock:
+        events = list(_events)
+    with open(path, 'w', encoding='utf-8') as f:
+        for name, begin, duration, tid, args in events:
+            f.write(json.dumps({'span': name, 'start_ms': (begin - _start) / 1e6, 'duration_ms': duration / 1e6,
+                                'thread': tid, **({'args': args} if args else {})}, ensure_ascii=False) + '\n')
+        f.write(json.dumps({'summary': summary()}, ensure_ascii=False) + '\n')
+
+
+def save(path=None):
+    path = path or output
+    if path is None:
+        return
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        writeChromeTrace(path)
+    else:
+        writeLog(path)
+
+
+if os.environ.get(ENV):
+    enable(os.environ[ENV])
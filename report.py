@@ -0,0 +1,170 @@
+import io
+import csv
+import html
+import json
+from functools import lru_cache
+
+import numpy as np
+
+import profiling
+
+FORMATS = ('text', 'html', 'csv', 'json')
+HEADER_PADDING = 2  # Мінімальний запас ширини стовпця над заголовком (як у tabulate)
+
+DATA_COLUMNS = ('К-ть\nспост.', 'Суми', 'Середні')  # Після стовпців повторень
+ANOVA_COLUMNS = ('Дисперсія', 'Сума\nквадратів', 'Ступені\nсвободи', 'Середній\nквадрат', 'Fф', 'F05')
+
+
+@lru_cache(maxsize=256)
+def gridLayout(widths: tuple) -> tuple:
+    """Precompiled fancy-grid borders and row template for the given column widths."""
+    def line(left, fill, cross, right):
+        return left + cross.join(fill * (w + 2) for w in widths) + right
+
+    row = '│' + '│'.join(f' {{:^{w}}} ' for w in widths) + '│'
+    return line('╒', '═', '╤', '╕'), line('╞', '═', '╪', '╡'), line('├', '─', '┼', '┤'), line('╘', '═', '╧', '╛'), row
+
+
+def fancyGrid(headers, rows) -> str:
+    """Centered fancy-grid table of preformatted cells; headers may span lines."""
+    headers = [h.split('\n') for h in headers]
+    widths = [max(map(len, h)) + HEADER_PADDING for h in headers]
+    if rows:
+        widths = [max(w, max(map(len, column))) for w, column in zip(widths, zip(*rows))]
+    top, head, sep, bottom, row = gridLayout(tuple(widths))
+    height = max(map(len, headers))
+    lines = [top]
+    lines += [row.format(*(h[k] if k < len(h) else '' for h in headers)) for k in range(height)]
+    lines.append(head)
+    for i, cells in enumerate(rows):
+        if i:
+            lines.append(sep)
+        lines.append(row.format(*cells))
+    lines.append(bottom)
+    return '\n'.join(lines)
+
+
+def dataTable(disp) -> tuple:
+    # Повторення форматуються рядок за рядком із готових сум і середніх; пропущені клітинки порожні
+    headers = ['Варіанти', *map(str, range(1, disp.X.shape[1] + 1)), *DATA_COLUMNS]
+    rows = [[str(i + 1), *('' if x != x else f'{x:.2f}' for x in values), str(count), f'{total:.2f}', f'{mean:.2f}']
+            for i, (values, count, total, mean) in enumerate(zip(disp.X.tolist(), disp.counts.tolist(),
+                                                                 disp.V.tolist(), disp.means.tolist()))]
+    return headers, rows
+
+
+def anovaTable(disp) -> tuple:
+    rows = [['Загальна', f'{disp.CY:.2f}', str(disp.N - 1), '--', '--', '--'],
+            ['Варіантів', f'{disp.CV:.2f}', str(disp.l - 1), str(disp.s2v), str(disp.Ff), str(disp.F05)],
+            ['Залишок (помилки)', f'{disp.CZ:.2f}', str(disp.N - disp.l), str(disp.s2), '--', '--']]
+    return list(ANOVA_COLUMNS), rows
+
+
+def totals(disp) -> list:
+    return [('Загальна кількіть спостережень', f'{disp.N}'),
+            ('Загальна сума', f'{round(disp.V.sum(), 2)}'),
+            ('Середнє по досліду', f'{disp.avg}')]
+
+
+def summary(disp) -> list:
+    return [('Критерій суттєвості', f'{disp.Ff}'),
+            ('Критерій F на 5%-му рівні значимості', f'{disp.F05}'),
+            ('Помилка досліду', f'{disp.sx}'),
+            ('Помилка різниці середніх', f'{disp.sd}'),
+            ('Відносна помилка різниці середніх', f'{disp.sd_percent}%'),
+            ('Коефіцієнт варіації', f'{disp.v}%'),
+            ('НІР абсолютне', f'{disp.HCP05}'),
+            ('НІР відносне', f'{disp.HCP05_percent}%')]
+
+
+def toText(disp) -> str:
+    text = fancyGrid(*dataTable(disp))
+    text += '\n\n' + '\n'.join(f'{label}: {value}' for label, value in totals(disp))
+    text += '\n\nРезультати дисперсійного аналізу\n'
+    text += fancyGrid(*anovaTable(disp))
+    text += '\n\n' + '\n'.join(f'{label}: {value}' for label, value in summary(disp))
+    return text
+
+
+def htmlTable(headers, rows) -> str:
+    head = ''.join(f'<th>{html.escape(h).replace(chr(10), "<br>")}</th>' for h in headers)
+    body = ''.join('<tr>' + ''.join(f'<td>{html.escape(c)}</td>' for c in cells) + '</tr>' for cells in rows)
+    return f'<table>\n<thead><tr>{head}</tr></thead>\n<tbody>{body}</tbody>\n</table>'
+
+
+def htmlLines(pairs) -> str:
+    return '<p>' + '<br>\n'.join(html.escape(f'{label}: {value}') for label, value in pairs) + '</p>'
+
+
+def toHtml(disp) -> str:
+    return '\n'.join([htmlTable(*dataTable(disp)), htmlLines(totals(disp)),
+                      '<h3>Результати дисперсійного аналізу</h3>', htmlTable(*anovaTable(disp)),
+                      htmlLines(summary(disp))])
+
+
+def toCsvRows(disp) -> list:
+    # Таблиця даних, порожній рядок, таблиця дисперсійного аналізу, порожній рядок, показники
+    headers, rows = dataTable(disp)
+    anova_headers, anova_rows = anovaTable(disp)
+    return [[h.replace('\n', ' ') for h in headers], *rows, [],
+            [h.replace('\n', ' ') for h in anova_headers], *anova_rows, [],
+            *([label, value] for label, value in totals(disp) + summary(disp))]
+
+
+def toJson(disp) -> dict:
+    names = ('l', 'n', 'N', 'avg', 'CY', 'CV', 'CZ', 's2v', 's2', 'v', 'sx', 'sd', 'sd_percent',
+             'Ff', 'F05', 't05', 'HCP05', 'HCP05_percent')
+    out = {name: getattr(disp, name) for name in names}
+    out = {name: value.item() if hasattr(value, 'item') else value for name, value in out.items()}
+    X = disp.X.astype(object)
+    X[np.isnan(disp.X)] = None
+    out.update(X=X.tolist(), V=disp.V.tolist(), means=disp.means.tolist(), counts=disp.counts.tolist())
+    return out
+
+
+def render(disp, fmt='text') -> str:
+    if fmt == 'text':
+        return toText(disp)
+    if fmt == 'html':
+        return toHtml(disp)
+    if fmt == 'json':
+        return json.dumps(toJson(disp), ensure_ascii=False)
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(toCsvRows(disp))
+        return buffer.getvalue()
+    raise ValueError(f'Unknown format: {fmt}')
+
+
+@profiling.timed('writeReports')
+def writeReports(f, analyses, fmt='text', names=None) -> int:
+    """Stream reports of many trials to an open text file; returns their number.
+
+    Each report is written as soon as it is rendered, so ``analyses`` may be
+    a generator. ``text`` reports are separated by a blank line, ``html`` is
+    wrapped in one document with a heading per trial, ``json`` is written as
+    JSON Lines and ``csv`` sections start with a row holding the trial name.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown format: {fmt}')
+    names = iter(names or ())
+    if fmt == 'html':
+        f.write('<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8"></head>\n<body>\n')
+    writer = csv.writer(f, lineterminator='\n') if fmt == 'csv' else None
+    count = 0
+    for disp in analyses:
+        name = next(names, None) or str(count + 1)
+        if fmt == 'text':
+            f.write(('\n\n' if count else '') + toText(disp))
+        elif fmt == 'html':
+            f.write(f'<h2>{html.escape(name)}</h2>\n{toHtml(disp)}\n')
+        elif fmt == 'json':
+            f.write(json.dumps({'name': name, **toJson(disp)}, ensure_ascii=False) + '\n')
+        else:
+            writer.writerows([[name], *toCsvRows(disp), []])
+        count += 1
+    if fmt == 'html':
+        f.write('</body>\n</html>\n')
+    elif fmt == 'text' and count:
+        f.write('\n')
+    return count
@@ -0,0 +1,126 @@
+import numpy as np
+
+import anova
+import profiling
+
+# Перестановочний тест і бутстреп для ефекту варіантів без припущення нормальності.
+# Перестановки й вибірки генеруються блоками (тисячі за одну операцію NumPy), а F
+# рахується з сум по варіантах, як у BatchOutput, без побудови DispOutput.
+
+BLOCK_VALUES = 1 << 21  # Значень в одному блоці перестановок (обмежує тимчасову пам'ять)
+TASK_SIZE = 10_000  # Перестановок на завдання; кожне має власний потік випадкових чисел
+
+
+def _tasks(total: int, seed):
+    # Потоки залежать лише від seed і номера завдання, тож результат не залежить від кількості процесів
+    seq = np.random.SeedSequence(seed)
+    counts = [TASK_SIZE] * (total // TASK_SIZE) + ([total % TASK_SIZE] if total % TASK_SIZE else [])
+    return seq, counts, seq.spawn(len(counts))
+
+
+def _map(fn, counts, streams, args, workers):
+    if workers and workers > 1 and len(counts) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(fn, *args, count, stream) for count, stream in zip(counts, streams)]
+            return [future.result() for future in futures]
+    return [fn(*args, count, stream) for count, stream in zip(counts, streams)]
+
+
+def _observations(X):
+    # Спостереження без пропусків, згруповані по непорожніх варіантах, і їх кількості
+    X = np.asarray(X, dtype=float)
+    mask = ~np.isnan(X)
+    present = mask.any(axis=1)
+    return X[present], mask[present], np.sum(mask[present], axis=1)
+
+
+def _permutationCount(x, starts, counts, threshold, count, stream) -> int:
+    """Worker: number of label permutations whose sum of V²/n over variants reaches ``threshold``."""
+    rng = np.random.default_rng(stream)
+    block = max(1, BLOCK_VALUES // len(x))
+    hits = 0
+    for start in range(0, count, block):
+        b = min(block, count - start)
+        V = np.add.reduceat(rng.permuted(np.tile(x, (b, 1)), axis=1), starts, axis=1)
+        hits += int(np.count_nonzero(np.square(V) @ (1 / counts) >= threshold))
+    return hits
+
+
+def _bootstrapBlock(means, residuals, counts, count, stream) -> np.ndarray:
+    """Worker: variant means of ``count`` residual resamples.
+
+    Every variant gets its fitted mean plus ``counts[i]`` residuals drawn from
+    the pooled, variance-rescaled residuals of the whole trial.
+    """
+    rng = np.random.default_rng(stream)
+    l, width = len(counts), int(np.max(counts))
+    keep = np.arange(width) < counts[:, None]
+    block = max(1, BLOCK_VALUES // (l * width))
+    out = []
+    for start in range(0, count, block):
+        b = min(block, count - start)
+        R = np.where(keep, residuals[rng.integers(0, len(residuals), size=(b, l, width))], 0.0)
+        out.append(means + np.sum(R, axis=2) / counts)
+    return np.concatenate(out)
+
+
+@profiling.timed('permutationTest')
+def permutationTest(X, permutations=10_000, seed=None, workers=None) -> dict:
+    """Permutation p-value of the variant F test for one variants x replicates matrix.
+
+    With the total sum of squares fixed under relabelling, F grows with the sum
+    of V²/n over variants, so only that is computed per permutation; missing
+    cells (NaN) keep every variant's count. The p-value counts the observed
+    labelling too: (1 + hits) / (1 + permutations).
+    """
+    X = np.asarray(X, dtype=float)
+    Y, mask, n = _observations(X)
+    x = Y[mask] - np.mean(Y[mask])  # Центрування не змінює порядок статистик, але зберігає точність
+    starts = np.cumsum(n) - n
+    threshold = np.square(np.add.reduceat(x, starts)) @ (1 / n) * (1 - 1e-12)  # Допуск на округлення
+    seq, sizes, streams = _tasks(permutations, seed)
+    hits = sum(_map(_permutationCount, sizes, streams, (x, starts, n, threshold), workers))
+    return {'Ff': anova.batchAnova(X[None]).Ff[0].item(),
+            'p_value': (1 + hits) / (1 + permutations),
+            'permutations': permutations,
+            'seed': seq.entropy}
+
+
+@profiling.timed('bootstrap')
+def bootstrap(X, resamples=10_000, level=0.95, seed=None, workers=None) -> dict:
+    """Percentile bootstrap intervals for variant means and their differences from the first variant.
+
+    Residuals (observations minus their variant mean) are pooled across the
+    trial, rescaled by √(N/(N - l)) so their variance is the error mean square,
+    and resampled with replacement; each variant keeps its number of
+    observations. Unlike resampling replicates within a variant this does not
+    shrink the spread with few replicates, and it does not assume normality.
+    The first non-empty variant is the standard for ``diffs``. η² is reported
+    as a point estimate only: as a ratio of sums of squares it is biased
+    upwards in small trials and percentile intervals around it do not cover.
+    """
+    X = np.asarray(X, dtype=float)
+    out = anova.batchAnova(X[None])
+    Y, mask, n = _observations(X)
+    means = np.sum(np.where(mask, Y, 0.0), axis=1) / n
+    N = int(np.sum(n))
+    if N <= len(n):
+        raise ValueError('Bootstrap needs at least one variant with two or more observations')
+    residuals = (Y - means[:, None])[mask] * np.sqrt(N / (N - len(n)))
+    seq, sizes, streams = _tasks(resamples, seed)
+    boot = np.concatenate(_map(_bootstrapBlock, sizes, streams, (means, residuals, n), workers))
+    q = [(1 - level) / 2, (1 + level) / 2]
+    present = ~np.isnan(X).all(axis=1)
+    means_ci = iter(np.quantile(boot, q, axis=0).T.tolist())
+    diffs_ci = iter(np.quantile(boot[:, 1:] - boot[:, :1], q, axis=0).T.tolist())
+    diffs = iter((means[1:] - means[0]).tolist())
+    standard = np.flatnonzero(present)[0]
+    return {'eta2': (out.CV[0] / out.CY[0]).item(),
+            'means': out.means[0].tolist(),
+            'means_ci': [next(means_ci) if k else None for k in present],
+            'diffs': [next(diffs) if k and i != standard else None for i, k in enumerate(present)],
+            'diffs_ci': [next(diffs_ci) if k and i != standard else None for i, k in enumerate(present)],
+            'level': level,
+            'resamples': resamples,
+            'seed': seq.entropy}
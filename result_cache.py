@@ -0,0 +1,138 @@
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+import numpy as np
+
+VERSION = 3  # Змінювати, коли змінюються розрахунки або звіти: старі записи стануть недосяжними
+TRIM_EVERY = 64  # Як часто (у записах) перевіряти розмір кешу на диску
+
+_MISSING = object()
+
+
+def matrixKey(X, kind: str, **options) -> str:
+    """Content hash of a matrix plus the analysis options that produced an artifact."""
+    X = np.ascontiguousarray(X, dtype=float)
+    h = hashlib.sha256()
+    h.update(json.dumps([VERSION, kind, X.shape, options], sort_keys=True, default=str).encode('utf-8'))
+    h.update(X.tobytes())
+    return h.hexdigest()
+
+
+class ResultCache:
+    """LRU cache of analysis results and rendered reports keyed by content hash.
+
+    Values are kept pickled, so callers always get their own copy (e.g.
+    ``roundVals`` on a cached ``DispOutput`` does not touch the cache). The
+    in-memory part is bounded by ``max_items`` and ``max_bytes``; with a
+    ``directory`` entries are also written there atomically and the
+    directory is trimmed to ``max_disk_bytes`` by modification time, so it
+    can be shared between processes.
+    """
+
+    def __init__(self, max_items=256, max_bytes=64 << 20, directory=None, max_disk_bytes=512 << 20):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        self.max_disk_bytes = max_disk_bytes
+        self.items = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.lock = threading.Lock()
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __contains__(self, key):
+        return key in self.items or bool(self.directory and self.diskPath(key).exists())
+
+    def diskPath(self, key) -> Path:
+        return self.directory / key[:2] / f'{key}.pkl'
+
+    def get(self, key, default=None):
+        with self.lock:
+            blob = self.items.get(key)
+            if blob is not None:
+                self.items.move_to_end(key)
+        if blob is None and self.directory:
+            path = self.diskPath(key)
+            try:
+                blob = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                blob = None
+            if blob is not None:
+                with self.lock:
+                    self.remember(key, blob)
+        with self.lock:
+            if blob is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return pickle.loads(blob)
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.remember(key, blob)
+            self.puts += 1
+            trim = self.puts % TRIM_EVERY == 0
+        if self.directory:
+            path = self.diskPath(key)
+            path.parent.mkdir(exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp, path)
+            if trim:
+                self.trimDisk()
+
+    def getOrCompute(self, key, compute):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def remember(self, key, blob):
+        if key in self.items:
+            self.bytes -= len(self.items.pop(key))
+        if len(blob) > self.max_bytes:
+            return
+        self.items[key] = blob
+        self.bytes += len(blob)
+        while len(self.items) > self.max_items or self.bytes > self.max_bytes:
+            _, old = self.items.popitem(last=False)
+            self.bytes -= len(old)
+
+    def trimDisk(self):
+        files = []
+        for path in self.directory.glob('*/*.pkl'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        return {'items': len(self.items), 'bytes': self.bytes, 'hits': self.hits, 'misses': self.misses}
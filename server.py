@@ -0,0 +1,316 @@
+import sys
+import json
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import anova
+
+# Локальний HTTP/JSON-сервіс без сторонніх залежностей (asyncio + власний розбір HTTP/1.1).
+#   POST /analyze  {"matrix": [[...]], "round": 2}                -> показники BatchOutput
+#   POST /report   {"matrix": [[...]], "format": "text", "round": 2} -> {"report": "..."}
+#   POST /excel    {"matrix": [[...]], "round": 2}                -> файл .xlsx
+#   GET  /metrics  затримки по ендпоінтах і розміри мікропакетів
+#   GET  /health
+# Запити /analyze, що прийшли майже одночасно, рахуються одним викликом batchAnova.
+
+HOST = '127.0.0.1'
+PORT = 8765
+BATCH_WINDOW = 0.002  # Скільки чекати інших запитів після першого, с
+MAX_BATCH = 1024
+MAX_BODY = 32 << 20
+LATENCY_WINDOW = 10_000  # Скільки останніх вимірів зберігати для перцентилів
+
+STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+          413: 'Payload Too Large', 500: 'Internal Server Error'}
+XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parseMatrix(payload) -> np.ndarray:
+    try:
+        X = np.asarray(payload['matrix'], dtype=float)
+    except KeyError:
+        raise HttpError(400, 'missing "matrix"')
+    except (TypeError, ValueError) as e:
+        raise HttpError(400, f'bad matrix: {e}')
+    if X.ndim != 2 or min(X.shape) < 2:
+        raise HttpError(400, f'expected at least 2 variants x 2 replicates, got shape {X.shape}')
+    if np.isinf(X).any():
+        raise HttpError(400, 'matrix contains infinite values')  # null - пропущена клітинка
+    return X
+
+
+def parseDigits(payload, default=None):
+    digits = payload.get('round')
+    if digits is None:
+        return default
+    if not isinstance(digits, int) or isinstance(digits, bool):
+        raise HttpError(400, f'"round" must be an integer or null, got {digits!r}')
+    return digits
+
+
+def computeBatch(matrices: list, digits: list) -> list:
+    out = anova.batchAnova(matrices)
+    records = []
+    for i, n in enumerate(digits):
+        record = out[i]
+        if n is not None:
+            record = {key: np.round(value, n).item() if key in anova.BatchOutput.rounded else value
+                      for key, value in record.items()}
+        records.append(record)
+    return records
+
+
+def renderExcel(X, digits) -> bytes:
+    # Виконується в окремому процесі, щоб не тримати GIL циклу подій
+    from disp_output import DispOutput
+    disp = DispOutput(X)
+    disp.roundVals(digits)
+    return disp.toExcelBytes()
+
+
+class MicroBatcher:
+    """Collect concurrent analysis requests and compute them in one vectorized call."""
+
+    def __init__(self, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.window = window
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def submit(self, X, digits) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((X, digits, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.batches += 1
+            self.items += len(batch)
+            self.largest = max(self.largest, len(batch))
+            try:
+                # Обчислення в потоці: цикл подій тим часом приймає наступний пакет
+                records = await loop.run_in_executor(None, computeBatch, [X for X, _, _ in batch],
+                                                     [digits for _, digits, _ in batch])
+            except Exception:
+                # Пакет упав через якийсь один запит: перераховуємо поодинці, щоб помилку отримав лише він
+                for X, digits, future in batch:
+                    try:
+                        record = (await loop.run_in_executor(None, computeBatch, [X], [digits]))[0]
+                    except Exception as e:
+                        if not future.done():
+                            future.set_exception(e)
+                    else:
+                        if not future.done():
+                            future.set_result(record)
+            else:
+                for (_, _, future), record in zip(batch, records):
+                    if not future.done():
+                        future.set_result(record)
+
+    def stats(self) -> dict:
+        return {'batches': self.batches, 'items': self.items, 'largest': self.largest,
+                'mean_size': self.items / self.batches if self.batches else 0}
+
+
+class Metrics:
+    """Per-endpoint request counts and latency percentiles over a sliding window."""
+
+    def __init__(self):
+        self.endpoints = {}
+
+    def add(self, endpoint, seconds, status):
+        entry = self.endpoints.setdefault(endpoint, {'count': 0, 'errors': 0,
+                                                     'latency': deque(maxlen=LATENCY_WINDOW)})
+        entry['count'] += 1
+        entry['errors'] += status >= 400
+        entry['latency'].append(seconds * 1e3)
+
+    def toDict(self) -> dict:
+        result = {}
+        for endpoint, entry in self.endpoints.items():
+            latency = np.asarray(entry['latency'])
+            p50, p95, p99 = np.percentile(latency, [50, 95, 99]) if len(latency) else (0, 0, 0)
+            result[endpoint] = {'count': entry['count'], 'errors': entry['errors'],
+                                'mean_ms': float(latency.mean()) if len(latency) else 0,
+                                'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99),
+                                'max_ms': float(latency.max()) if len(latency) else 0}
+        return result
+
+
+class AnalysisServer:
+    def __init__(self, host=HOST, port=PORT, excel_workers=1):
+        self.host = host
+        self.port = port
+        self.batcher = MicroBatcher()
+        self.metrics = Metrics()
+        self.excel_pool = ProcessPoolExecutor(max_workers=excel_workers)
+        self.routes = {('POST', '/analyze'): self.analyze,
+                       ('POST', '/report'): self.report,
+                       ('POST', '/excel'): self.excel,
+                       ('GET', '/metrics'): self.metricsView,
+                       ('GET', '/health'): self.health}
+        self.server = None
+
+    async def start(self):
+        self.batcher.start()
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serveForever(self):
+        await self.start()
+        print(f'listening on http://{self.host}:{self.port}', file=sys.stderr)
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server:
+            self.server.close()
+        if self.batcher.task:
+            self.batcher.task.cancel()
+        self.excel_pool.shutdown(wait=False, cancel_futures=True)
+
+    async def analyze(self, payload):
+        # Перевірка до мікропакета: хибний запит не повинен зіпсувати чужі результати
+        return await self.batcher.submit(parseMatrix(payload), parseDigits(payload))
+
+    async def report(self, payload):
+        from disp_output import DispOutput
+        disp = DispOutput(parseMatrix(payload))
+        disp.roundVals(parseDigits(payload, 2))
+        try:
+            return {'report': disp.render(payload.get('format', 'text'))}
+        except ValueError as e:
+            raise HttpError(400, str(e))
+
+    async def excel(self, payload):
+        X = parseMatrix(payload)
+        data = await asyncio.get_running_loop().run_in_executor(self.excel_pool, renderExcel, X,
+                                                                parseDigits(payload, 2))
+        return data, XLSX
+
+    async def metricsView(self, payload):
+        return {'endpoints': self.metrics.toDict(), 'batching': self.batcher.stats()}
+
+    async def health(self, payload):
+        return {'status': 'ok'}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request = await readRequest(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                start = time.perf_counter()
+                status, content, content_type = await self.dispatch(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writeResponse(writer, status, content, content_type, keep_alive)
+                await writer.drain()
+                self.metrics.add(f'{method} {path}', time.perf_counter() - start, status)
+                if not keep_alive:
+                    break
+        except HttpError as e:
+            writeResponse(writer, e.status, json.dumps({'error': str(e)}).encode(), 'application/json', False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        path = path.split('?', 1)[0]
+        route = self.routes.get((method, path))
+        try:
+            if route is None:
+                known = any(p == path for _, p in self.routes)
+                raise HttpError(405 if known else 404, f'{method} {path} is not supported')
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError as e:
+                raise HttpError(400, f'bad JSON: {e}')
+            if not isinstance(payload, dict):
+                raise HttpError(400, 'expected a JSON object')
+            result = await route(payload)
+        except HttpError as e:
+            return e.status, json.dumps({'error': str(e)}).encode(), 'application/json'
+        except (ValueError, TypeError) as e:
+            return 400, json.dumps({'error': str(e)}).encode(), 'application/json'
+        except Exception as e:
+            return 500, json.dumps({'error': f'{type(e).__name__}: {e}'}).encode(), 'application/json'
+        if isinstance(result, tuple):
+            return 200, result[0], result[1]
+        # NaN (порожній варіант, сталі дані) - не JSON, суворі клієнти його не приймуть
+        content = json.dumps(anova.jsonSafe(result), ensure_ascii=False, allow_nan=False).encode('utf-8')
+        return 200, content, 'application/json; charset=utf-8'
+
+
+async def readRequest(reader):
+    """Read one HTTP/1.1 request; ``None`` when the client closed the connection."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, 'malformed request line')
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive':
+        headers['connection'] = 'close'
+    length = headers.get('content-length') or '0'
+    if not (length.isascii() and length.isdigit()):
+        raise HttpError(400, f'bad Content-Length: {length!r}')
+    length = int(length)
+    if length > MAX_BODY:
+        raise HttpError(413, f'body larger than {MAX_BODY} bytes')
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, headers, body
+
+
+def writeResponse(writer, status, content: bytes, content_type, keep_alive=True):
+    head = (f'HTTP/1.1 {status} {STATUS.get(status, "")}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {len(content)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+    writer.write(head.encode('latin-1') + content)
+
+
+def main(args):
+    server = AnalysisServer(args.host, args.port, args.excel_workers)
+    try:
+        asyncio.run(server.serveForever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import archive
+from archive import TrialArchive
+
+
+@pytest.fixture
+def matrices():
+    rng = np.random.default_rng(5)
+    return [rng.normal(50, 5, (rng.integers(2, 8), rng.integers(2, 6))) for _ in range(40)]
+
+
+def test_incremental_appends_stay_linear(tmp_path, matrices, monkeypatch):
+    monkeypatch.setattr(archive, 'COMPACT_MIN', 4096)
+    path = tmp_path / 'season.vatrial'
+    for i, X in enumerate(matrices):
+        with TrialArchive(path, 'a') as store:
+            store.add(f't{i}', X, {'source': f't{i}.csv'})
+    data = sum(X.size * 8 for X in matrices)
+    assert path.stat().st_size < 3 * data + 2 * 4096
+    store = TrialArchive(path)
+    assert store.ids() == [f't{i}' for i in range(len(matrices))]
+    assert all(np.array_equal(store[f't{i}'], X) for i, X in enumerate(matrices))
+    assert store.info('t3')['meta'] == {'source': 't3.csv'}
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_compact_keeps_trials(tmp_path, matrices):
+    path = tmp_path / 'season.vatrial'
+    for i, X in enumerate(matrices[:10]):
+        with TrialArchive(path, 'a') as store:
+            store.add(f't{i}', X)
+    size = path.stat().st_size
+    with TrialArchive(path, 'a') as store:
+        store.compact()
+        store.add('last', matrices[10])
+    assert path.stat().st_size < size
+    store = TrialArchive(path)
+    assert len(store) == 11
+    assert all(np.array_equal(store[f't{i}'], X) for i, X in enumerate(matrices[:10]))
+    assert np.array_equal(store['last'], matrices[10])
+    with pytest.raises(ValueError):
+        store.compact()
+
+
+@pytest.mark.parametrize('cut', [1, 8, 100, 'index', 'trailer'])
+def test_crash_tail_recovery(tmp_path, matrices, cut):
+    path = tmp_path / 'season.vatrial'
+    with TrialArchive(path, 'a') as store:
+        for i, X in enumerate(matrices[:5]):
+            store.add(f't{i}', X)
+    size = path.stat().st_size
+    with TrialArchive(path, 'a') as store:
+        store.add('new', matrices[5])
+    full = path.read_bytes()
+    # Обрив посеред дописування: лишається частина нових даних, індексу чи трейлера
+    if cut == 'index':
+        end = len(full) - archive.TRAILER.size - 5
+    elif cut == 'trailer':
+        end = len(full) - 3
+    else:
+        end = size + cut
+    path.write_bytes(full[:end])
+    store = TrialArchive(path)
+    assert store.ids() == [f't{i}' for i in range(5)]
+    assert all(np.array_equal(store[f't{i}'], X) for i, X in enumerate(matrices[:5]))
+    with TrialArchive(path, 'a') as store:
+        store.add('again', matrices[6])
+    store = TrialArchive(path)
+    assert store.ids()[-1] == 'again' and np.array_equal(store['again'], matrices[6])
@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+import pytest
+
+import batch_runner
+
+FILES = 7
+CHUNK = 2
+
+
+@pytest.fixture
+def trials(tmp_path):
+    root = tmp_path / 'trials'
+    root.mkdir()
+    rng = np.random.default_rng(3)
+    for i in range(FILES):
+        np.savetxt(root / f'trial{i}.csv', rng.normal(50, 5, (4, 3)), delimiter=',')
+    (root / 'broken.csv').write_text('a,b\nc,d\n')
+    return root
+
+
+def readLines(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run(root, output, **kwargs):
+    return batch_runner.run(root, output, workers=1, chunk_size=CHUNK, **kwargs)
+
+
+def test_run_writes_every_file_once(trials, tmp_path):
+    output = tmp_path / 'out.jsonl'
+    summary = run(trials, output)
+    assert summary == {'files': FILES + 1, 'skipped': 0, 'ok': FILES, 'failed': 1, 'retry': 0}
+    assert sorted(record['file'] for record in readLines(output)) == sorted(str(p) for p in trials.glob('trial*'))
+    assert len(readLines(tmp_path / 'out.jsonl.errors.jsonl')) == 1
+
+    summary = run(trials, output)
+    assert summary['files'] == 0 and summary['skipped'] == FILES + 1
+    assert len(readLines(output)) == FILES
+
+
+def test_restart_replaces_previous_output(trials, tmp_path):
+    output = tmp_path / 'out.jsonl'
+    run(trials, output)
+    summary = run(trials, output, resume=False)
+    assert summary['ok'] == FILES
+    assert len(readLines(output)) == FILES
+    assert len(readLines(tmp_path / 'out.jsonl.errors.jsonl')) == 1
+
+
+def test_resume_drops_results_not_in_manifest(trials, tmp_path):
+    output = tmp_path / 'out.jsonl'
+    run(trials, output)
+    # Обрив між записом результатів і маніфесту: останній чанк є у виводі, але не в маніфесті
+    manifest = tmp_path / 'out.jsonl.manifest.jsonl'
+    entries = readLines(manifest)
+    last = [entry for entry in entries if 'file' in entry][-1]
+    kept = [entry for entry in entries if entry.get('end') != last['end']]
+    manifest.write_text(''.join(json.dumps(entry) + '\n' for entry in kept), encoding='utf-8')
+    with open(output, 'a', encoding='utf-8') as f:
+        f.write('{"file": "half-written')
+
+    summary = run(trials, output)
+    assert summary['files'] == len(entries) - len(kept)
+    files = [record['file'] for record in readLines(output)]
+    assert len(files) == len(set(files)) == FILES
+
+
+def test_parquet_restart_removes_old_parts(trials, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    output = tmp_path / 'out.parquet'
+    run(trials, output)
+    parts = set(output.glob('part-*.parquet'))
+    run(trials, output, resume=False)
+    assert not parts & set(output.glob('part-*.parquet'))
+    assert pq.read_table(output).num_rows == FILES
@@ -0,0 +1,9 @@
+import cli
+
+
+def test_profile_flag_does_not_take_the_command():
+    args = cli.buildParser().parse_args(['--profile', 'analyze', 'x.csv'])
+    assert args.profile and args.profile_output is None
+    assert args.command == 'analyze' and args.inputs == ['x.csv']
+    args = cli.buildParser().parse_args(['--profile-output', 'trace.json', 'analyze', 'x.csv'])
+    assert args.profile_output == 'trace.json' and args.inputs == ['x.csv']
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('PyQt6')
+from PyQt6.QtCore import Qt  # noqa: E402
+
+from matrix_model import MatrixModel  # noqa: E402
+
+
+@pytest.mark.parametrize('value', [1234567.25, 123.4567, 0.1, 1e-7, 3.0, -2.5e20, 1 / 3])
+def test_edit_round_trip_keeps_value(value):
+    model = MatrixModel(2, 2)
+    index = model.index(0, 1)
+    assert model.setData(index, str(value))
+    # Відкрити редактор і натиснути Enter: у модель повертається той самий текст
+    assert model.setData(index, model.data(index, Qt.ItemDataRole.EditRole))
+    assert model.X[0, 1] == value
+
+
+def test_display_is_compact():
+    model = MatrixModel(1, 2)
+    model.setData(model.index(0, 0), '1234567,25')
+    assert model.data(model.index(0, 0)) == '1.23457e+06'
+    assert model.data(model.index(0, 0), Qt.ItemDataRole.EditRole) == '1234567.25'
+    assert model.data(model.index(0, 1), Qt.ItemDataRole.EditRole) == ''
+    assert np.isnan(model.X[0, 1])
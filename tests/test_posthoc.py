@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+import posthoc
+
+
+@pytest.mark.parametrize('level, k, df', [(0.95, 2, 5), (0.95, 10, 20), (0.99, 10, 3), (0.95, 100, 500),
+                                          (0.95 ** 9, 10, 36)])
+def test_studentized_range_quantile_matches_scipy(level, k, df):
+    from scipy.stats import studentized_range
+    assert posthoc.q_crit(level, k, df) == pytest.approx(studentized_range.ppf(level, k, df), rel=1e-8)
+
+
+def test_duncan_ranges_match_published_table():
+    # Duncan (1955), alpha = 0.05, df = 10, p = 2..5
+    assert np.round(posthoc.duncanRanges(5, 10), 3).tolist() == [3.151, 3.293, 3.376, 3.430]
+
+
+def test_letters_separate_distant_means():
+    comparisons = posthoc.pairwise([50.0, 40.0, 49.5, 40.2], 1.0, 4, 12, 'tukey')
+    assert comparisons.letters == ['a', 'b', 'a', 'b']
@@ -0,0 +1,106 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import anova
+from disp_output import DispOutput
+
+# Зафіксовані результати: будь-яка зміна формул, критичних значень чи вигляду звіту
+# має бути свідомою (тоді tests/data оновлюються разом зі зміною)
+
+DATA = Path(__file__).with_name('data')
+NAN = float('nan')
+MATRICES = {
+    'balanced': [[40.1, 41.2, 39.8, 40.5],
+                 [44.0, 45.5, 43.2, 46.1],
+                 [42.3, 41.7, 43.0, 42.2],
+                 [38.9, 39.5, 40.2, 39.1]],
+    'unbalanced': [[40.1, 41.2, 39.8, 40.5],
+                   [44.0, 45.5, NAN, 46.1],
+                   [42.3, 41.7, 43.0, 42.2],
+                   [NAN, 39.5, 40.2, 39.1]],
+}
+FIELDS = anova.BatchOutput.fields + ('V', 'means', 'counts')
+
+
+def pinned(name) -> dict:
+    with open(DATA / 'pinned.json', encoding='utf-8') as f:
+        return json.load(f)[name]
+
+
+@pytest.mark.parametrize('name', MATRICES)
+def test_disp_output_matches_pinned(name):
+    disp = DispOutput(np.array(MATRICES[name]))
+    expected = pinned(name)
+    for field in FIELDS:
+        assert np.asarray(getattr(disp, field)).tolist() == pytest.approx(expected[field], rel=1e-12), field
+
+
+@pytest.mark.parametrize('name', MATRICES)
+def test_batch_is_bit_identical_to_disp_output(name):
+    X = np.array(MATRICES[name])
+    disp = DispOutput(X)
+    out = anova.batchAnova(np.stack([X, X]))
+    for field in FIELDS:
+        expected = np.asarray(getattr(disp, field))
+        for i in range(2):
+            assert np.array_equal(np.asarray(getattr(out, field)[i]), expected), field
+
+
+def test_unbalanced_matches_scipy_f_test():
+    from scipy import stats
+    X = np.array(MATRICES['unbalanced'])
+    disp = DispOutput(X)
+    groups = [row[~np.isnan(row)] for row in X]
+    assert disp.Ff == pytest.approx(stats.f_oneway(*groups).statistic, rel=1e-10)
+    assert disp.F05 == pytest.approx(stats.f.ppf(0.95, disp.l - 1, disp.N - disp.l), rel=1e-12)
+
+
+@pytest.mark.parametrize('name', MATRICES)
+def test_text_report_matches_pinned(name):
+    disp = DispOutput(np.array(MATRICES[name]))
+    disp.roundVals(2)
+    assert disp.toMarkdown() == (DATA / f'report_{name}.txt').read_text(encoding='utf-8')
+
+
+def legacyMarkdown(disp) -> str:
+    # Звіт у тому вигляді, як його будував DispOutput.toMarkdown через pandas/tabulate
+    # до появи report.py (лише повні матриці)
+    import pandas as pd
+    options = dict(index=False, tablefmt='fancy_grid', floatfmt='.2f', stralign='center', numalign='center')
+    columns = ['Варіанти', *map(str, range(1, disp.n + 1)), 'К-ть\nспост.', 'Суми', 'Середні']
+    body = [[str(i + 1), *disp.X[i], disp.n, disp.V[i], disp.means[i]] for i in range(disp.l)]
+    text = pd.DataFrame(body, columns=columns).to_markdown(**options)
+    text += f'\n\nЗагальна кількіть спостережень: {disp.N}'
+    text += f'\nЗагальна сума: {round(disp.V.sum(), 2)}'
+    text += f'\nСереднє по досліду: {disp.avg}'
+    body = [['Загальна', disp.CY, disp.N - 1, '--', '--', '--'],
+            ['Варіантів', disp.CV, disp.l - 1, disp.s2v, disp.Ff, disp.F05],
+            ['Залишок (помилки)', disp.CZ, disp.N - disp.l, disp.s2, '--', '--']]
+    columns = ['Дисперсія', 'Сума\nквадратів', 'Ступені\nсвободи', 'Середній\nквадрат', 'Fф', 'F05']
+    text += '\n\nРезультати дисперсійного аналізу\n'
+    text += pd.DataFrame(body, columns=columns).to_markdown(**options)
+    text += '\n\n'
+    text += f'Критерій суттєвості: {disp.Ff}\n'
+    text += f'Критерій F на 5%-му рівні значимості: {disp.F05}\n'
+    text += f'Помилка досліду: {disp.sx}\n'
+    text += f'Помилка різниці середніх: {disp.sd}\n'
+    text += f'Відносна помилка різниці середніх: {disp.sd_percent}%\n'
+    text += f'Коефіцієнт варіації: {disp.v}%\n'
+    text += f'НІР абсолютне: {disp.HCP05}\n'
+    text += f'НІР відносне: {disp.HCP05_percent}%'
+    return text
+
+
+def test_text_report_is_byte_identical_to_tabulate():
+    pytest.importorskip('pandas')
+    pytest.importorskip('tabulate')
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        l, n = rng.integers(2, 12), rng.integers(2, 8)
+        X = np.round(rng.normal(rng.uniform(5, 500), rng.uniform(0.5, 20), (l, n)), int(rng.integers(0, 3)))
+        disp = DispOutput(X)
+        disp.roundVals(2)
+        assert disp.toMarkdown() == legacyMarkdown(disp)
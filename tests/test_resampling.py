@@ -0,0 +1,41 @@
+import numpy as np
+
+import resampling
+
+
+def coverage(errors, runs=150, resamples=1000):
+    rng = np.random.default_rng(0)
+    mu = np.linspace(0, 2, 6)
+    means = diffs = 0.0
+    for k in range(runs):
+        X = mu[:, None] + errors(rng, (6, 4))
+        X[1, 0] = np.nan
+        result = resampling.bootstrap(X, resamples, seed=k)
+        m = np.array(result['means_ci'])
+        d = np.array(result['diffs_ci'][1:])
+        means += np.mean((m[:, 0] <= mu) & (mu <= m[:, 1]))
+        diffs += np.mean((d[:, 0] <= mu[1:] - mu[0]) & (mu[1:] - mu[0] <= d[:, 1]))
+    return means / runs, diffs / runs
+
+
+def test_bootstrap_coverage_normal():
+    means, diffs = coverage(lambda rng, shape: rng.normal(size=shape))
+    assert means > 0.9 and diffs > 0.9
+
+
+def test_bootstrap_coverage_skewed():
+    means, diffs = coverage(lambda rng, shape: rng.lognormal(0, 0.8, shape) - np.exp(0.32))
+    assert means > 0.9 and diffs > 0.9
+
+
+def test_bootstrap_reproducible():
+    X = np.random.default_rng(1).normal(40, 2, (5, 4))
+    assert resampling.bootstrap(X, 2000, seed=3) == resampling.bootstrap(X, 2000, seed=3)
+
+
+def test_permutation_p_value_matches_f_test():
+    from scipy import stats
+    X = np.random.default_rng(2).normal(40, 2, (4, 5))
+    X[0] += 2
+    p = resampling.permutationTest(X, 20_000, seed=0)['p_value']
+    assert abs(p - stats.f_oneway(*X).pvalue) < 0.02
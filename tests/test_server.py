@@ -0,0 +1,45 @@
+import json
+import asyncio
+
+import pytest
+
+from server import AnalysisServer
+
+
+async def exchange(request: bytes):
+    server = AnalysisServer('127.0.0.1', 0)
+    await server.start()
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 10)
+        writer.close()
+    finally:
+        server.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), body
+
+
+def post(payload, length=None) -> bytes:
+    body = json.dumps(payload).encode()
+    length = len(body) if length is None else length
+    return (f'POST /analyze HTTP/1.1\r\nContent-Length: {length}\r\nConnection: close\r\n\r\n').encode() + body
+
+
+def test_non_finite_values_are_null():
+    matrix = [[1, 2, 3], [None, None, None], [4, 5, 7]]
+    status, body = asyncio.run(exchange(post({'matrix': matrix})))
+    assert status == 200
+    record = json.loads(body, parse_constant=pytest.fail)
+    assert record['means'][1] is None and record['counts'][1] == 0
+    status, body = asyncio.run(exchange(post({'matrix': [[5, 5], [5, 5]]})))
+    assert status == 200
+    assert json.loads(body, parse_constant=pytest.fail)['Ff'] is None
+
+
+@pytest.mark.parametrize('length', ['abc', '-5', '1e3', '１２'])
+def test_bad_content_length(length):
+    status, body = asyncio.run(exchange(post({'matrix': [[1, 2], [3, 4]]}, length)))
+    assert status == 400
+    assert 'Content-Length' in json.loads(body)['error']
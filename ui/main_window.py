@@ -18,7 +18,7 @@ class Ui_MainWindow(object):
         MainWindow.setDockNestingEnabled(False)
         self.centralwidget = QtWidgets.QWidget(MainWindow)
         self.centralwidget.setObjectName("centralwidget")
-        self.table = QtWidgets.QTableWidget(self.centralwidget)
+        self.table = QtWidgets.QTableView(self.centralwidget)
         self.table.setGeometry(QtCore.QRect(20, 120, 191, 83))
         font = QtGui.QFont()
         font.setPointSize(8)
@@ -26,21 +26,8 @@ class Ui_MainWindow(object):
         self.table.setFont(font)
         self.table.setShowGrid(True)
         self.table.setGridStyle(QtCore.Qt.PenStyle.SolidLine)
+        self.table.setSortingEnabled(False)
         self.table.setObjectName("table")
-        self.table.setColumnCount(3)
-        self.table.setRowCount(3)
-        item = QtWidgets.QTableWidgetItem()
-        self.table.setVerticalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.table.setVerticalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.table.setVerticalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.table.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.table.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.table.setHorizontalHeaderItem(2, item)
         self.table.horizontalHeader().setVisible(True)
         self.table.horizontalHeader().setCascadingSectionResizes(True)
         self.table.horizontalHeader().setDefaultSectionSize(50)
@@ -88,19 +75,6 @@ class Ui_MainWindow(object):
     def retranslateUi(self, MainWindow):
         _translate = QtCore.QCoreApplication.translate
         MainWindow.setWindowTitle(_translate("MainWindow", "MainWindow"))
-        self.table.setSortingEnabled(False)
-        item = self.table.verticalHeaderItem(0)
-        item.setText(_translate("MainWindow", "вар 1"))
-        item = self.table.verticalHeaderItem(1)
-        item.setText(_translate("MainWindow", "вар 2"))
-        item = self.table.verticalHeaderItem(2)
-        item.setText(_translate("MainWindow", "вар 3"))
-        item = self.table.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "повт 1"))
-        item = self.table.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "повт 2"))
-        item = self.table.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "повт 3"))
         self.rows_label.setText(_translate("MainWindow", "Кількість варіантів"))
         self.cols_label.setText(_translate("MainWindow", "Кількість повторень"))
         self.pushButton.setText(_translate("MainWindow", "Розрахувати"))
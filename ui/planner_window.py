@@ -0,0 +1,147 @@
+# Form implementation generated from reading ui file 'ui/planner.ui'
+#
+# Created by: PyQt6 UI code generator 6.11.0
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_PlannerWindow(object):
+    def setupUi(self, PlannerWindow):
+        PlannerWindow.setObjectName("PlannerWindow")
+        PlannerWindow.resize(760, 560)
+        self.s2_label = QtWidgets.QLabel(parent=PlannerWindow)
+        self.s2_label.setGeometry(QtCore.QRect(20, 20, 170, 24))
+        self.s2_label.setObjectName("s2_label")
+        self.s2 = QtWidgets.QDoubleSpinBox(parent=PlannerWindow)
+        self.s2.setGeometry(QtCore.QRect(200, 20, 110, 24))
+        self.s2.setDecimals(4)
+        self.s2.setMinimum(0.0001)
+        self.s2.setMaximum(1000000.0)
+        self.s2.setProperty("value", 1.0)
+        self.s2.setObjectName("s2")
+        self.mean_label = QtWidgets.QLabel(parent=PlannerWindow)
+        self.mean_label.setGeometry(QtCore.QRect(340, 20, 110, 24))
+        self.mean_label.setObjectName("mean_label")
+        self.mean = QtWidgets.QDoubleSpinBox(parent=PlannerWindow)
+        self.mean.setGeometry(QtCore.QRect(460, 20, 115, 24))
+        self.mean.setDecimals(2)
+        self.mean.setMaximum(1000000.0)
+        self.mean.setObjectName("mean")
+        self.variants_label = QtWidgets.QLabel(parent=PlannerWindow)
+        self.variants_label.setGeometry(QtCore.QRect(20, 50, 170, 24))
+        self.variants_label.setObjectName("variants_label")
+        self.variantsFrom = QtWidgets.QSpinBox(parent=PlannerWindow)
+        self.variantsFrom.setGeometry(QtCore.QRect(200, 50, 53, 24))
+        self.variantsFrom.setMinimum(2)
+        self.variantsFrom.setMaximum(200)
+        self.variantsFrom.setProperty("value", 2)
+        self.variantsFrom.setObjectName("variantsFrom")
+        self.variantsTo = QtWidgets.QSpinBox(parent=PlannerWindow)
+        self.variantsTo.setGeometry(QtCore.QRect(257, 50, 53, 24))
+        self.variantsTo.setMinimum(2)
+        self.variantsTo.setMaximum(200)
+        self.variantsTo.setProperty("value", 20)
+        self.variantsTo.setObjectName("variantsTo")
+        self.replicates_label = QtWidgets.QLabel(parent=PlannerWindow)
+        self.replicates_label.setGeometry(QtCore.QRect(340, 50, 110, 24))
+        self.replicates_label.setObjectName("replicates_label")
+        self.replicatesFrom = QtWidgets.QSpinBox(parent=PlannerWindow)
+        self.replicatesFrom.setGeometry(QtCore.QRect(460, 50, 55, 24))
+        self.replicatesFrom.setMinimum(2)
+        self.replicatesFrom.setMaximum(100)
+        self.replicatesFrom.setProperty("value", 2)
+        self.replicatesFrom.setObjectName("replicatesFrom")
+        self.replicatesTo = QtWidgets.QSpinBox(parent=PlannerWindow)
+        self.replicatesTo.setGeometry(QtCore.QRect(520, 50, 55, 24))
+        self.replicatesTo.setMinimum(2)
+        self.replicatesTo.setMaximum(100)
+        self.replicatesTo.setProperty("value", 10)
+        self.replicatesTo.setObjectName("replicatesTo")
+        self.alpha_label = QtWidgets.QLabel(parent=PlannerWindow)
+        self.alpha_label.setGeometry(QtCore.QRect(20, 80, 170, 24))
+        self.alpha_label.setObjectName("alpha_label")
+        self.alphas = QtWidgets.QLineEdit(parent=PlannerWindow)
+        self.alphas.setGeometry(QtCore.QRect(200, 80, 110, 24))
+        self.alphas.setObjectName("alphas")
+        self.effect_label = QtWidgets.QLabel(parent=PlannerWindow)
+        self.effect_label.setGeometry(QtCore.QRect(340, 80, 110, 24))
+        self.effect_label.setObjectName("effect_label")
+        self.effects = QtWidgets.QLineEdit(parent=PlannerWindow)
+        self.effects.setGeometry(QtCore.QRect(460, 80, 115, 24))
+        self.effects.setObjectName("effects")
+        self.relative = QtWidgets.QCheckBox(parent=PlannerWindow)
+        self.relative.setGeometry(QtCore.QRect(590, 80, 150, 24))
+        self.relative.setObjectName("relative")
+        self.target_label = QtWidgets.QLabel(parent=PlannerWindow)
+        self.target_label.setGeometry(QtCore.QRect(20, 110, 170, 24))
+        self.target_label.setObjectName("target_label")
+        self.target = QtWidgets.QDoubleSpinBox(parent=PlannerWindow)
+        self.target.setGeometry(QtCore.QRect(200, 110, 110, 24))
+        self.target.setDecimals(2)
+        self.target.setMinimum(0.5)
+        self.target.setMaximum(0.99)
+        self.target.setSingleStep(0.05)
+        self.target.setProperty("value", 0.8)
+        self.target.setObjectName("target")
+        self.design_label = QtWidgets.QLabel(parent=PlannerWindow)
+        self.design_label.setGeometry(QtCore.QRect(340, 110, 110, 24))
+        self.design_label.setObjectName("design_label")
+        self.design = QtWidgets.QComboBox(parent=PlannerWindow)
+        self.design.setGeometry(QtCore.QRect(460, 110, 115, 24))
+        self.design.setObjectName("design")
+        self.design.addItem("")
+        self.design.addItem("")
+        self.show_label = QtWidgets.QLabel(parent=PlannerWindow)
+        self.show_label.setGeometry(QtCore.QRect(20, 150, 170, 24))
+        self.show_label.setObjectName("show_label")
+        self.shown = QtWidgets.QComboBox(parent=PlannerWindow)
+        self.shown.setGeometry(QtCore.QRect(200, 150, 110, 24))
+        self.shown.setObjectName("shown")
+        self.shown.addItem("")
+        self.shown.addItem("")
+        self.shown.addItem("")
+        self.shown.addItem("")
+        self.alphaChoice = QtWidgets.QComboBox(parent=PlannerWindow)
+        self.alphaChoice.setGeometry(QtCore.QRect(340, 150, 110, 24))
+        self.alphaChoice.setObjectName("alphaChoice")
+        self.effectChoice = QtWidgets.QComboBox(parent=PlannerWindow)
+        self.effectChoice.setGeometry(QtCore.QRect(460, 150, 115, 24))
+        self.effectChoice.setObjectName("effectChoice")
+        self.table = QtWidgets.QTableView(parent=PlannerWindow)
+        self.table.setGeometry(QtCore.QRect(20, 190, 720, 320))
+        font = QtGui.QFont()
+        font.setPointSize(8)
+        self.table.setFont(font)
+        self.table.setObjectName("table")
+        self.status = QtWidgets.QLabel(parent=PlannerWindow)
+        self.status.setGeometry(QtCore.QRect(20, 520, 720, 24))
+        self.status.setObjectName("status")
+
+        self.retranslateUi(PlannerWindow)
+        QtCore.QMetaObject.connectSlotsByName(PlannerWindow)
+
+    def retranslateUi(self, PlannerWindow):
+        _translate = QtCore.QCoreApplication.translate
+        PlannerWindow.setWindowTitle(_translate("PlannerWindow", "Планування досліду"))
+        self.s2_label.setText(_translate("PlannerWindow", "Дисперсія помилки s²"))
+        self.mean_label.setText(_translate("PlannerWindow", "Середнє"))
+        self.variants_label.setText(_translate("PlannerWindow", "Кількість варіантів"))
+        self.replicates_label.setText(_translate("PlannerWindow", "Повторень"))
+        self.alpha_label.setText(_translate("PlannerWindow", "Рівні значущості"))
+        self.alphas.setText(_translate("PlannerWindow", "0.05, 0.01"))
+        self.effect_label.setText(_translate("PlannerWindow", "Різниця"))
+        self.effects.setText(_translate("PlannerWindow", "1:10"))
+        self.relative.setText(_translate("PlannerWindow", "у % від середнього"))
+        self.target_label.setText(_translate("PlannerWindow", "Бажана потужність"))
+        self.design_label.setText(_translate("PlannerWindow", "Схема"))
+        self.design.setItemText(0, _translate("PlannerWindow", "Рендомізована"))
+        self.design.setItemText(1, _translate("PlannerWindow", "Блоки"))
+        self.show_label.setText(_translate("PlannerWindow", "Показати"))
+        self.shown.setItemText(0, _translate("PlannerWindow", "Потужність, %"))
+        self.shown.setItemText(1, _translate("PlannerWindow", "НІР"))
+        self.shown.setItemText(2, _translate("PlannerWindow", "НІР, %"))
+        self.shown.setItemText(3, _translate("PlannerWindow", "Виявна різниця"))